@@ -9,6 +9,7 @@ Modules principaux:
 - fusion: Fusion des résultats PJ et Entreprises
 - map_generator: Génération de cartes Leaflet
 - bdnb: Accès à la Base Nationale des Bâtiments
+- cache: Cache persistant sur disque (géocodage, rues par zone)
 - logger: Système de logging
 - tools: Types et utilitaires communs
 - ui: Interface graphique PySide6
@@ -24,6 +25,6 @@ __author__ = "JE Project"
 from .tools import (
     Address, Coords, Street, Contact,
     EntrepriseData, DataPJ, FusedData,
-    sanitize, listify, safe_float, safe_int
+    sanitize, listify, safe_float, safe_int, has_json_file
 )
 from .logger import Logger
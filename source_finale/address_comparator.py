@@ -8,6 +8,22 @@ from tools import Address
 from logger import Logger
 
 
+# Suppression des accents en un seul passage (str.translate, implémenté en C)
+_ACCENT_TABLE = str.maketrans(
+    'àáâãäåèéêëìíîïòóôõöùúûüçñ',
+    'aaaaaaeeeeiiiiooooouuuucn'
+)
+
+# Expressions régulières compilées une fois pour toutes
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_SPACES_RE = re.compile(r'\s+')
+_DIGITS_RE = re.compile(r'\d+')
+_NON_DIGIT_RE = re.compile(r'\D')
+_POSTCODE_RE = re.compile(r'^\d{5}$')
+# Pattern: "numero voie code_postal ville"
+_ADDRESS_RE = re.compile(r'^(\d+)\s+(.+?)\s+(\d{5})\s+(.+)$')
+
+
 class AddressComparator:
     """Comparateur d'adresses avec gestion des abréviations et fautes de frappe"""
     
@@ -48,23 +64,11 @@ class AddressComparator:
         if not text:
             return ""
         
-        text = text.lower().strip()
-        
-        # Supprimer les accents
-        replacements = {
-            'à': 'a', 'á': 'a', 'â': 'a', 'ã': 'a', 'ä': 'a', 'å': 'a',
-            'è': 'e', 'é': 'e', 'ê': 'e', 'ë': 'e',
-            'ì': 'i', 'í': 'i', 'î': 'i', 'ï': 'i',
-            'ò': 'o', 'ó': 'o', 'ô': 'o', 'õ': 'o', 'ö': 'o',
-            'ù': 'u', 'ú': 'u', 'û': 'u', 'ü': 'u',
-            'ç': 'c', 'ñ': 'n'
-        }
-        
-        for accent, replacement in replacements.items():
-            text = text.replace(accent, replacement)
+        # Minuscules puis suppression des accents
+        text = text.lower().strip().translate(_ACCENT_TABLE)
         
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _NON_WORD_RE.sub(' ', text)
+        text = _SPACES_RE.sub(' ', text).strip()
         
         return text
 
@@ -89,7 +93,7 @@ class AddressComparator:
 
     def extract_numbers(self, text: str) -> List[str]:
         """Extrait tous les nombres d'une chaîne"""
-        return re.findall(r'\d+', str(text))
+        return _DIGITS_RE.findall(str(text))
 
     def calculate_similarity(self, str1: str, str2: str) -> float:
         """Calcule la similarité entre deux chaînes"""
@@ -154,8 +158,8 @@ class AddressComparator:
         if not code1 or not code2:
             return 0.0
         
-        norm_code1 = re.sub(r'\D', '', str(code1))
-        norm_code2 = re.sub(r'\D', '', str(code2))
+        norm_code1 = _NON_DIGIT_RE.sub('', str(code1))
+        norm_code2 = _NON_DIGIT_RE.sub('', str(code2))
         
         return 1.0 if norm_code1 == norm_code2 else 0.0
 
@@ -178,9 +182,7 @@ class AddressComparator:
         
         address_str = address_str.strip()
         
-        # Pattern: "numero voie code_postal ville"
-        pattern = r'^(\d+)\s+(.+?)\s+(\d{5})\s+(.+)$'
-        match = re.match(pattern, address_str)
+        match = _ADDRESS_RE.match(address_str)
         
         if match:
             return {
@@ -195,7 +197,7 @@ class AddressComparator:
         if len(parts) >= 4:
             code_postal_idx = None
             for i, part in enumerate(parts):
-                if re.match(r'^\d{5}$', part):
+                if _POSTCODE_RE.match(part):
                     code_postal_idx = i
                     break
             
@@ -4,9 +4,16 @@ import math
 import time
 import json
 import os
+import threading
 import requests
 from typing import Dict, List, Optional, Set
 
+# orjson (optionnel) : parsing JSON plus rapide, repli sur json sinon
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from tools import Coords, Address, Street
 from logger import Logger
 
@@ -18,13 +25,16 @@ class AddressProcessor:
         self.ban_url = "https://data.geopf.fr/geocodage/"
         self.ban_last_request = 0
         self.ban_request_seconds = 1/50  # 50 req/sec max
+        # Instance partagée entre plusieurs workers : le rate limiting doit être atomique
+        self._rate_lock = threading.Lock()
         
     def _rate_limit(self):
         """Applique le rate limiting pour la BAN"""
-        current_time = time.time()
-        if current_time - self.ban_last_request < self.ban_request_seconds:
-            time.sleep(self.ban_request_seconds - (current_time - self.ban_last_request))
-        self.ban_last_request = time.time()
+        with self._rate_lock:
+            current_time = time.time()
+            if current_time - self.ban_last_request < self.ban_request_seconds:
+                time.sleep(self.ban_request_seconds - (current_time - self.ban_last_request))
+            self.ban_last_request = time.time()
         
     def address_to_coordinates(self, address: Address, logger: Logger) -> Optional[Coords]:
         """Convertit une adresse en coordonnées latitude/longitude"""
@@ -161,8 +171,9 @@ class AddressProcessor:
     def load_street_from_json(self, file_path: str, logger: Logger) -> Optional[Street]:
         """Charge une rue depuis un fichier JSON"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            return orjson.loads(data) if orjson else json.loads(data)
         except Exception as e:
             logger.log(f"Erreur lors du chargement de {file_path}: {e}", level="ERROR")
             return None
@@ -294,12 +305,13 @@ class AddressProcessor:
             logger.log(f"Le dossier {dir_street} n'existe pas", level="ERROR")
             return streets
         
-        for file in os.listdir(dir_street):
-            if file.endswith('.json'):
-                file_path = os.path.join(dir_street, file)
-                street = self.load_street_from_json(file_path, logger)
-                if street:
-                    streets.append(street)
+        with os.scandir(dir_street) as it:
+            file_paths = [e.path for e in it if e.name.endswith('.json') and e.is_file()]
+        
+        for file_path in file_paths:
+            street = self.load_street_from_json(file_path, logger)
+            if street:
+                streets.append(street)
         
         logger.log(f"{len(streets)} rues chargées depuis {dir_street}")
         return streets
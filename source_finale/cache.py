@@ -0,0 +1,123 @@
+"""Module de cache persistant sur disque (géocodage, rues par zone)"""
+
+import os
+import json
+import time
+import hashlib
+import shutil
+import sqlite3
+from typing import Optional
+
+from tools import Address, Coords
+
+
+# Dossier de cache utilisateur, partagé entre les recherches
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "prospection")
+
+
+def make_cache_key(value) -> str:
+    """Calcule une clé stable (sha1) à partir d'une valeur sérialisable en JSON"""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class GeocodeCache:
+    """Cache SQLite des coordonnées déjà géocodées, indexé par adresse normalisée"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: Optional[int] = 30 * 24 * 3600):
+        self.db_path = db_path or os.path.join(CACHE_DIR, "geocode.sqlite")
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode "
+            "(addr_key TEXT PRIMARY KEY, lat REAL, lon REAL, ts INTEGER)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def address_key(address: Address) -> str:
+        """Clé de cache d'une adresse (insensible à la casse et aux espaces superflus)"""
+        normalized = {k: " ".join(str(v).split()).lower() for k, v in address.items()}
+        return make_cache_key(normalized)
+
+    def get(self, address: Address) -> Optional[Coords]:
+        """Retourne les coordonnées en cache, ou None si absentes ou expirées"""
+        row = self.conn.execute(
+            "SELECT lat, lon, ts FROM geocode WHERE addr_key = ?",
+            (self.address_key(address),)
+        ).fetchone()
+        if row is None:
+            return None
+        lat, lon, ts = row
+        if self.ttl_seconds is not None and ts + self.ttl_seconds < time.time():
+            return None
+        return {"latitude": lat, "longitude": lon}
+
+    def set(self, address: Address, coords: Coords):
+        """Enregistre les coordonnées d'une adresse"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO geocode (addr_key, lat, lon, ts) VALUES (?, ?, ?, ?)",
+            (self.address_key(address), coords['latitude'], coords['longitude'], int(time.time()))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class StreetsCache:
+    """
+    Cache des fichiers de rues (streets/*.json) par zone de recherche.
+    Clé: (lat, lon) arrondis à 4 décimales (~10 m) et rayon en km.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl_seconds: Optional[int] = 7 * 24 * 3600):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "streets")
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def area_key(center_lat: float, center_lon: float, radius_km: float) -> str:
+        return f"{round(center_lat, 4)}_{round(center_lon, 4)}_{radius_km}"
+
+    def _area_dir(self, center_lat: float, center_lon: float, radius_km: float) -> str:
+        return os.path.join(self.cache_dir, self.area_key(center_lat, center_lon, radius_km))
+
+    def restore(self, center_lat: float, center_lon: float, radius_km: float, dir_street: str) -> bool:
+        """Copie les rues en cache dans dir_street. Retourne False si absentes ou expirées."""
+        area_dir = self._area_dir(center_lat, center_lon, radius_km)
+        try:
+            with open(os.path.join(area_dir, self.MANIFEST), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if self.ttl_seconds is not None and manifest.get("created", 0) + self.ttl_seconds < time.time():
+            return False
+
+        shutil.copytree(
+            area_dir, dir_street, dirs_exist_ok=True,
+            ignore=shutil.ignore_patterns(self.MANIFEST)
+        )
+        return True
+
+    def store(self, center_lat: float, center_lon: float, radius_km: float, dir_street: str):
+        """Enregistre les rues de dir_street pour cette zone"""
+        area_dir = self._area_dir(center_lat, center_lon, radius_km)
+        tmp_dir = area_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.copytree(dir_street, tmp_dir)
+
+        manifest = {
+            "created": int(time.time()),
+            "center": [center_lat, center_lon],
+            "radius_km": radius_km
+        }
+        with open(os.path.join(tmp_dir, self.MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+        # Remplacement en fin de copie : une entrée incomplète n'est jamais lue
+        shutil.rmtree(area_dir, ignore_errors=True)
+        os.replace(tmp_dir, area_dir)
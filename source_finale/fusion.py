@@ -2,18 +2,28 @@
 
 import csv
 import os
+import re
 import math
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Sequence, Callable
+
+# numpy (optionnel) : calcul des distances vectorisé, repli sur math sinon
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 from tools import DataPJ, EntrepriseData, FusedData
 from logger import Logger
 
 
+EARTH_RADIUS_M = 6371000  # Rayon de la Terre en mètres
+
+
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calcule la distance en mètres entre deux points GPS (formule de Haversine).
     """
-    R = 6371000  # Rayon de la Terre en mètres
+    R = EARTH_RADIUS_M
     
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
@@ -27,6 +37,94 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
+def haversine_distances(
+    center_lat: float,
+    center_lon: float,
+    lats: Sequence[float],
+    lons: Sequence[float]
+) -> List[float]:
+    """
+    Distances en mètres entre un centre et une liste de points.
+    Un seul passage NumPy sur des tableaux float64 si disponible, boucle Python sinon.
+    """
+    if np is None:
+        return [haversine_distance(center_lat, center_lon, lat, lon) for lat, lon in zip(lats, lons)]
+    
+    lat_arr = np.asarray(lats, dtype=np.float64)
+    lon_arr = np.asarray(lons, dtype=np.float64)
+    dlat = np.radians(lat_arr - center_lat)
+    dlon = np.radians(lon_arr - center_lon)
+    a = np.sin(dlat / 2) ** 2 + \
+        math.cos(math.radians(center_lat)) * np.cos(np.radians(lat_arr)) * np.sin(dlon / 2) ** 2
+    return (2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))).tolist()
+
+
+# Codes de zone renvoyés par zone_codes()
+ZONE_IN, ZONE_TOLERANCE, ZONE_OUT = 0, 1, 2
+
+
+def zone_codes(distances: Sequence[float], radius_m: float, tolerance_m: float) -> List[int]:
+    """
+    Classe chaque distance en un seul passage: ZONE_IN, ZONE_TOLERANCE ou ZONE_OUT.
+    Avec NumPy, la classification est un searchsorted sur les deux seuils.
+    """
+    if np is None:
+        return [
+            ZONE_IN if d <= radius_m else ZONE_TOLERANCE if d <= tolerance_m else ZONE_OUT
+            for d in distances
+        ]
+    return np.searchsorted(
+        np.array([radius_m, tolerance_m], dtype=np.float64),
+        np.asarray(distances, dtype=np.float64),
+        side='left'
+    ).tolist()
+
+
+def _first_item(entry: Dict[str, Any], key: str) -> bool:
+    """Vrai si la liste entry[key] a un premier élément non vide"""
+    items = entry.get(key) or []
+    return bool(items and items[0])
+
+
+def _area_at_least(value: Any, minimum: float) -> bool:
+    """Vrai si la surface (nombre ou texte numérique) atteint le minimum"""
+    if not value:
+        return False
+    try:
+        return float(value) >= minimum
+    except (ValueError, TypeError):
+        return False
+
+
+# Critères d'intérêt: (poids, raison, test). Table construite une fois au chargement du module,
+# triée par poids décroissant pour pouvoir écarter un résultat au plus tôt.
+_QUALITY_RULES: Tuple[Tuple[int, str, Callable[[Dict[str, Any]], bool]], ...] = (
+    # Contact direct = très important
+    (2, "telephone", lambda e: bool(e.get("pj_phone")) or _first_item(e, "entreprise_phones")),
+    (2, "email", lambda e: _first_item(e, "entreprise_emails")),
+    # Entreprise identifiée = important
+    (2, "siret_siren", lambda e: bool(e.get("entreprise_siret") or e.get("entreprise_siren"))),
+    # Grande toiture = potentiel photovoltaïque important
+    (2, "grande_surface_toiture", lambda e: _area_at_least(e.get("roof_area_m2"), 100)),
+    (1, "site_web", lambda e: _first_item(e, "entreprise_websites")),
+    (1, "nom_identifie", lambda e: bool(e.get("entreprise_nom") or e.get("pj_title"))),
+    # Bâtiment caractérisé
+    (1, "dpe", lambda e: bool(e.get("classe_bilan_dpe"))),
+    # Parking = potentiel ombrières
+    (1, "parking", lambda e: _area_at_least(e.get("parking_area_m2"), 200)),
+    (1, "proprietaire_identifie", lambda e: bool(e.get("owner_name"))),
+)
+
+# Score maximal encore atteignable après chaque règle (sommes suffixes des poids)
+_QUALITY_REMAINING: Tuple[int, ...] = tuple(
+    sum(rule[0] for rule in _QUALITY_RULES[i + 1:]) for i in range(len(_QUALITY_RULES))
+)
+
+# Un résultat est intéressant si score >= 3
+# (au moins un contact + une identification OU plusieurs critères)
+MIN_INTEREST_SCORE = 3
+
+
 def is_interesting_result(entry: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """
     Détermine si un résultat est "intéressant" à conserver.
@@ -46,70 +144,16 @@ def is_interesting_result(entry: Dict[str, Any]) -> Tuple[bool, List[str]]:
     reasons = []
     score = 0
     
-    # Téléphone
-    has_phone = bool(entry.get("pj_phone"))
-    ent_phones = entry.get("entreprise_phones") or []
-    if has_phone or (ent_phones and len(ent_phones) > 0 and ent_phones[0]):
-        score += 2  # Contact direct = très important
-        reasons.append("telephone")
-    
-    # Email
-    ent_emails = entry.get("entreprise_emails") or []
-    if ent_emails and len(ent_emails) > 0 and ent_emails[0]:
-        score += 2  # Contact direct = très important
-        reasons.append("email")
-    
-    # Site web
-    ent_websites = entry.get("entreprise_websites") or []
-    if ent_websites and len(ent_websites) > 0 and ent_websites[0]:
-        score += 1
-        reasons.append("site_web")
-    
-    # SIRET/SIREN (entreprise officielle)
-    if entry.get("entreprise_siret") or entry.get("entreprise_siren"):
-        score += 2  # Entreprise identifiée = important
-        reasons.append("siret_siren")
-    
-    # Nom identifié
-    if entry.get("entreprise_nom") or entry.get("pj_title"):
-        score += 1
-        reasons.append("nom_identifie")
-    
-    # Informations DPE (bâtiment caractérisé)
-    if entry.get("classe_bilan_dpe"):
-        score += 1
-        reasons.append("dpe")
-    
-    # Surface de toiture significative (potentiel photovoltaïque)
-    roof_area = entry.get("roof_area_m2")
-    if roof_area:
-        try:
-            if float(roof_area) >= 100:
-                score += 2  # Grande surface = potentiel important
-                reasons.append("grande_surface_toiture")
-        except (ValueError, TypeError):
-            pass
-    
-    # Surface parking (potentiel ombrières)
-    parking_area = entry.get("parking_area_m2")
-    if parking_area:
-        try:
-            if float(parking_area) >= 200:
-                score += 1
-                reasons.append("parking")
-        except (ValueError, TypeError):
-            pass
-    
-    # Propriétaire identifié
-    if entry.get("owner_name"):
-        score += 1
-        reasons.append("proprietaire_identifie")
-    
-    # Un résultat est intéressant si score >= 3
-    # (au moins un contact + une identification OU plusieurs critères)
-    is_interesting = score >= 3
+    for (weight, reason, test), remaining in zip(_QUALITY_RULES, _QUALITY_REMAINING):
+        if test(entry):
+            score += weight
+            reasons.append(reason)
+        elif score + remaining < MIN_INTEREST_SCORE:
+            # Seuil inatteignable: inutile d'évaluer les critères restants.
+            # (Pas d'arrêt anticipé côté acceptation: les raisons doivent être complètes.)
+            return False, reasons
     
-    return is_interesting, reasons
+    return score >= MIN_INTEREST_SCORE, reasons
 
 
 def filter_results_by_zone_and_interest(
@@ -136,12 +180,25 @@ def filter_results_by_zone_and_interest(
     out_zone_interesting = []
     out_zone_excluded = []
     
-    for entry in fused_data:
-        lat = entry.get("latitude")
-        lon = entry.get("longitude")
-        
+    # Distances de toutes les entrées géolocalisées calculées en un seul passage
+    located = [
+        i for i, entry in enumerate(fused_data)
+        if entry.get("latitude") is not None and entry.get("longitude") is not None
+    ]
+    located_distances = haversine_distances(
+        center_lat, center_lon,
+        [fused_data[i]["latitude"] for i in located],
+        [fused_data[i]["longitude"] for i in located]
+    )
+    # Index -> (distance, code de zone) ; le score d'intérêt n'est calculé que hors zone
+    zones = dict(zip(located, zip(
+        located_distances,
+        zone_codes(located_distances, radius_m, tolerance_m)
+    )))
+    
+    for i, entry in enumerate(fused_data):
         # Si pas de coordonnées, vérifier si intéressant
-        if lat is None or lon is None:
+        if i not in zones:
             is_interesting, reasons = is_interesting_result(entry)
             if is_interesting:
                 entry["_filter_status"] = "no_coords_but_interesting"
@@ -152,15 +209,14 @@ def filter_results_by_zone_and_interest(
                 out_zone_excluded.append(entry)
             continue
         
-        # Calculer la distance au centre
-        distance = haversine_distance(center_lat, center_lon, lat, lon)
+        distance, zone = zones[i]
         entry["_distance_to_center"] = round(distance)
         
-        if distance <= radius_m:
+        if zone == ZONE_IN:
             # Dans la zone - garder
             entry["_filter_status"] = "in_zone"
             in_zone.append(entry)
-        elif distance <= tolerance_m:
+        elif zone == ZONE_TOLERANCE:
             # Légèrement hors zone (tolérance) - garder si a des coords
             entry["_filter_status"] = "in_tolerance_zone"
             in_zone.append(entry)
@@ -385,16 +441,16 @@ def _make_owner_name(ent: Dict) -> Optional[str]:
     return " ".join(parts) if parts else None
 
 
+# Pattern: "numero voie, code_postal ville"
+_ADDRESS_RE = re.compile(r'^(\d+)\s+(.+?),?\s+(\d{5})\s+(.+)$')
+
+
 def _parse_address_string(address_str: str) -> Optional[Dict]:
     """Parse une adresse string en composants"""
-    import re
-    
     if not address_str:
         return None
     
-    # Pattern: "numero voie, code_postal ville"
-    pattern = r'^(\d+)\s+(.+?),?\s+(\d{5})\s+(.+)$'
-    match = re.match(pattern, address_str.strip())
+    match = _ADDRESS_RE.match(address_str.strip())
     
     if match:
         return {
@@ -407,6 +463,36 @@ def _parse_address_string(address_str: str) -> Optional[Dict]:
     return None
 
 
+def _fused_entry_to_row(entry: FusedData) -> List[Any]:
+    """Convertit une entrée fusionnée en ligne du CSV (ordre des colonnes de save_fused_csv)"""
+    return [
+        entry.get("numero", ""),
+        entry.get("voie", ""),
+        entry.get("code_postal", ""),
+        entry.get("ville", ""),
+        entry.get("latitude", ""),
+        entry.get("longitude", ""),
+        entry.get("_distance_to_center", ""),
+        entry.get("pj_title", ""),
+        entry.get("pj_phone", ""),
+        entry.get("annee_construction", ""),
+        entry.get("classe_bilan_dpe", ""),
+        entry.get("entreprise_nom", ""),
+        entry.get("entreprise_category", ""),
+        "; ".join(entry.get("entreprise_phones") or []),
+        "; ".join(entry.get("entreprise_emails") or []),
+        "; ".join(entry.get("entreprise_websites") or []),
+        entry.get("entreprise_siren", ""),
+        entry.get("entreprise_siret", ""),
+        entry.get("entreprise_naf", ""),
+        entry.get("owner_name", ""),
+        entry.get("owner_role", ""),
+        entry.get("roof_area_m2", ""),
+        entry.get("parking_area_m2", ""),
+        entry.get("building_year", ""),
+    ]
+
+
 def save_fused_csv(fused_data: List[FusedData], output_file: str, logger: Logger):
     """Sauvegarde les données fusionnées en CSV"""
     logger.log(f"Sauvegarde CSV fusionné: {output_file}", "INFO")
@@ -425,38 +511,11 @@ def save_fused_csv(fused_data: List[FusedData], output_file: str, logger: Logger
         "Surface_Toiture_m2", "Surface_Parking_m2", "Annee_Construction_OSM"
     ]
     
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+    # Tampon d'écriture de 64 Ko et writerows (boucle en C) plutôt qu'un writerow par entrée
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 16) as f:
         writer = csv.writer(f)
         writer.writerow(headers)
-        
-        for entry in fused_data:
-            row = [
-                entry.get("numero", ""),
-                entry.get("voie", ""),
-                entry.get("code_postal", ""),
-                entry.get("ville", ""),
-                entry.get("latitude", ""),
-                entry.get("longitude", ""),
-                entry.get("_distance_to_center", ""),
-                entry.get("pj_title", ""),
-                entry.get("pj_phone", ""),
-                entry.get("annee_construction", ""),
-                entry.get("classe_bilan_dpe", ""),
-                entry.get("entreprise_nom", ""),
-                entry.get("entreprise_category", ""),
-                "; ".join(entry.get("entreprise_phones") or []),
-                "; ".join(entry.get("entreprise_emails") or []),
-                "; ".join(entry.get("entreprise_websites") or []),
-                entry.get("entreprise_siren", ""),
-                entry.get("entreprise_siret", ""),
-                entry.get("entreprise_naf", ""),
-                entry.get("owner_name", ""),
-                entry.get("owner_role", ""),
-                entry.get("roof_area_m2", ""),
-                entry.get("parking_area_m2", ""),
-                entry.get("building_year", ""),
-            ]
-            writer.writerow(row)
+        writer.writerows(_fused_entry_to_row(entry) for entry in fused_data)
     
     logger.both(f"CSV fusionné sauvegardé: {output_file}", "SUCCESS")
 
@@ -539,41 +598,65 @@ def save_filtered_results(
     return main_results
 
 
+def _fused_row_to_entry(row: Dict[str, str]) -> Dict[str, Any]:
+    """Convertit une ligne du CSV fusionné en entrée pour la carte"""
+    return {
+        "numero": row.get("Numero", ""),
+        "voie": row.get("Voie", ""),
+        "code_postal": row.get("Code_Postal", ""),
+        "ville": row.get("Ville", ""),
+        "latitude": float(row["Latitude"]) if row.get("Latitude") else None,
+        "longitude": float(row["Longitude"]) if row.get("Longitude") else None,
+        "_distance_to_center": int(row["Distance_Centre_m"]) if row.get("Distance_Centre_m") else None,
+        "pj_title": row.get("PJ_Titre"),
+        "pj_phone": row.get("PJ_Telephone"),
+        "annee_construction": row.get("BDNB_Annee"),
+        "classe_bilan_dpe": row.get("BDNB_DPE"),
+        "entreprise_nom": row.get("Entreprise_Nom"),
+        "entreprise_category": row.get("Entreprise_Categorie"),
+        "entreprise_phones": row.get("Entreprise_Telephones", "").split("; ") if row.get("Entreprise_Telephones") else [],
+        "entreprise_emails": row.get("Entreprise_Emails", "").split("; ") if row.get("Entreprise_Emails") else [],
+        "entreprise_websites": row.get("Entreprise_Sites", "").split("; ") if row.get("Entreprise_Sites") else [],
+        "entreprise_siren": row.get("SIREN"),
+        "entreprise_siret": row.get("SIRET"),
+        "entreprise_naf": row.get("NAF"),
+        "owner_name": row.get("Proprietaire_Nom"),
+        "owner_role": row.get("Proprietaire_Role"),
+        "roof_area_m2": row.get("Surface_Toiture_m2"),
+        "parking_area_m2": row.get("Surface_Parking_m2"),
+        "building_year": row.get("Annee_Construction_OSM"),
+    }
+
+
+def iter_fused_csv(
+    csv_file: str,
+    chunksize: int = 10_000
+) -> Iterator[Tuple[List[Dict[str, Any]], int, int]]:
+    """
+    Lit un CSV fusionné par blocs de `chunksize` lignes.
+    Produit (entrées du bloc, octets lus, taille totale du fichier) pour suivre la progression.
+    """
+    total = os.path.getsize(csv_file)
+    
+    with open(csv_file, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
+        reader = csv.DictReader(f)
+        chunk = []
+        for row in reader:
+            chunk.append(_fused_row_to_entry(row))
+            if len(chunk) >= chunksize:
+                # Position du tampon binaire : approximative mais suffisante pour une progression
+                yield chunk, min(f.buffer.tell(), total), total
+                chunk = []
+        yield chunk, total, total
+
+
 def load_fused_csv(csv_file: str, logger: Logger) -> List[Dict[str, Any]]:
     """Charge un CSV fusionné pour l'affichage carte"""
     results = []
     
     try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                entry = {
-                    "numero": row.get("Numero", ""),
-                    "voie": row.get("Voie", ""),
-                    "code_postal": row.get("Code_Postal", ""),
-                    "ville": row.get("Ville", ""),
-                    "latitude": float(row["Latitude"]) if row.get("Latitude") else None,
-                    "longitude": float(row["Longitude"]) if row.get("Longitude") else None,
-                    "_distance_to_center": int(row["Distance_Centre_m"]) if row.get("Distance_Centre_m") else None,
-                    "pj_title": row.get("PJ_Titre"),
-                    "pj_phone": row.get("PJ_Telephone"),
-                    "annee_construction": row.get("BDNB_Annee"),
-                    "classe_bilan_dpe": row.get("BDNB_DPE"),
-                    "entreprise_nom": row.get("Entreprise_Nom"),
-                    "entreprise_category": row.get("Entreprise_Categorie"),
-                    "entreprise_phones": row.get("Entreprise_Telephones", "").split("; ") if row.get("Entreprise_Telephones") else [],
-                    "entreprise_emails": row.get("Entreprise_Emails", "").split("; ") if row.get("Entreprise_Emails") else [],
-                    "entreprise_websites": row.get("Entreprise_Sites", "").split("; ") if row.get("Entreprise_Sites") else [],
-                    "entreprise_siren": row.get("SIREN"),
-                    "entreprise_siret": row.get("SIRET"),
-                    "entreprise_naf": row.get("NAF"),
-                    "owner_name": row.get("Proprietaire_Nom"),
-                    "owner_role": row.get("Proprietaire_Role"),
-                    "roof_area_m2": row.get("Surface_Toiture_m2"),
-                    "parking_area_m2": row.get("Surface_Parking_m2"),
-                    "building_year": row.get("Annee_Construction_OSM"),
-                }
-                results.append(entry)
+        for chunk, _, _ in iter_fused_csv(csv_file):
+            results.extend(chunk)
         
         logger.log(f"Chargé {len(results)} entrées depuis {csv_file}", "INFO")
         
@@ -1,13 +1,22 @@
 """Module de logging pour le projet"""
 
 import os
+import atexit
+import threading
 from datetime import datetime
 
 
 class Logger:
     def __init__(self, log_path: str):
         self.log_file = log_path
+        # Plusieurs threads (scrapping parallèle) peuvent écrire dans le même fichier
+        self._lock = threading.Lock()
         self.ensure_log_file_exists()
+        # Taille bornée à l'ouverture plutôt qu'à chaque message (relecture complète du fichier)
+        self._trim_log()
+        # Fichier ouvert une seule fois, écritures bufferisées (vidé sur ERROR/SUCCESS et à la fermeture)
+        self._fh = open(self.log_file, 'a', buffering=1 << 16, encoding='utf-8')
+        atexit.register(self.close)
     
     def ensure_log_file_exists(self):
         """Crée le fichier de log s'il n'existe pas"""
@@ -21,9 +30,12 @@ class Logger:
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         log_message = f"[{timestamp}] [{level}] {message}\n"
         
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_message)
-        self._trim_log()
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._fh.write(log_message)
+            if level in ("ERROR", "SUCCESS"):
+                self._fh.flush()
 
     def console(self, message: str, level: str = "INFO"):
         """Affiche uniquement dans la console"""
@@ -46,6 +58,13 @@ class Logger:
         self.console(message, level)
         self.log(message, level)
 
+    def close(self):
+        """Vide le tampon et ferme le fichier de log"""
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+        atexit.unregister(self.close)
+
     def _trim_log(self):
         """Conserve uniquement les 500 dernières lignes du log"""
         try:
@@ -20,9 +20,9 @@ import webbrowser
 from typing import List, Optional
 
 from logger import Logger
-from tools import Address, Street
+from tools import Address, Street, has_json_file
 from address_processor import AddressProcessor
-from scrapper_pj import ScrapperPagesJaunes
+from scrapper_pj import process_streets
 from entreprises import EntrepriseSearcher
 from fusion import fuse_results, save_fused_csv, load_fused_csv, fused_to_map_features
 from map_generator import save_map_html
@@ -144,7 +144,7 @@ def select_existing_folder() -> Optional[str]:
     print("\nDossiers disponibles:")
     for i, folder in enumerate(folders, 1):
         streets_dir = os.path.join(output_dir, folder, 'streets')
-        has_streets = os.path.exists(streets_dir) and any(f.endswith('.json') for f in os.listdir(streets_dir)) if os.path.exists(streets_dir) else False
+        has_streets = has_json_file(streets_dir)
         status = "✓ rues" if has_streets else "○ vide"
         print(f"  {i}. {folder} [{status}]")
     
@@ -256,16 +256,12 @@ def run_complete_workflow():
     # Étape 2: Scrapping Pages Jaunes
     logger.both("\nEtape 2: Scrapping Pages Jaunes (navigateur visible)...", "PROGRESS")
     
-    scrapper = ScrapperPagesJaunes()
-    pj_results = []
-    
-    try:
-        for i, street in enumerate(streets, 1):
-            logger.both(f"Rue {i}/{len(streets)}: {street['name']}", "PROGRESS")
-            results = scrapper.process_street(street, logger, output_dirpath)
-            pj_results.extend(results)
-    finally:
-        scrapper.close_browser()
+    pj_results = process_streets(
+        streets, logger, output_dirpath,
+        on_street_done=lambda done, street: logger.both(
+            f"Rue {done}/{len(streets)}: {street['name']}", "PROGRESS"
+        )
+    )
     
     # Étape 3: Recherche entreprises
     logger.both("\nEtape 3: Enrichissement entreprises...", "PROGRESS")
@@ -370,16 +366,12 @@ def run_from_folder():
     # Étape 2: Scrapping Pages Jaunes
     logger.both("\nScrapping Pages Jaunes (navigateur visible)...", "PROGRESS")
     
-    scrapper = ScrapperPagesJaunes()
-    pj_results = []
-    
-    try:
-        for i, street in enumerate(streets, 1):
-            logger.both(f"Rue {i}/{len(streets)}: {street['name']}", "PROGRESS")
-            results = scrapper.process_street(street, logger, folder)
-            pj_results.extend(results)
-    finally:
-        scrapper.close_browser()
+    pj_results = process_streets(
+        streets, logger, folder,
+        on_street_done=lambda done, street: logger.both(
+            f"Rue {done}/{len(streets)}: {street['name']}", "PROGRESS"
+        )
+    )
     
     # Recherche entreprises
     logger.both("\nEnrichissement entreprises...", "PROGRESS")
@@ -477,7 +469,7 @@ def run_map_only():
             center_lon = sum(c[1] for c in valid_coords) / len(valid_coords)
             
             # Générer la carte
-            map_file = csv_file.replace('.csv', '_carte.html')
+            map_file = os.path.splitext(csv_file)[0] + '_carte.html'
             
             features = [d for d in data if d.get("latitude") and d.get("longitude")]
             
@@ -4,36 +4,51 @@ import json
 import os
 from typing import List, Dict, Any, Optional
 
+# orjson (optionnel) : sérialisation du GeoJSON plus rapide, repli sur json sinon
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from tools import sanitize
 
 
-def build_map_html(
-    center_lat: float, 
-    center_lon: float, 
-    radius_m: int, 
-    features: List[Dict[str, Any]],
-    title: str = "Carte Prospection"
-) -> str:
+def dumps_json(obj: Any) -> str:
+    """JSON compact (orjson si disponible); types inconnus convertis en texte"""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# Clés de position, exclues des propriétés affichées
+_COORD_KEYS = frozenset(("lat", "lon", "latitude", "longitude"))
+
+
+def _first_not_none(a: Any, b: Any) -> Any:
+    """Premier argument non None (contrairement à `a or b`, 0.0 est une valeur valide)"""
+    return a if a is not None else b
+
+
+def build_marker_columns(features: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
     """
-    Construit une page HTML Leaflet autonome avec:
-    - fond satellite Esri + OSM
-    - cercle du rayon
-    - clustering
-    - popups détaillées
+    Transforme les features (lat/lon + propriétés) en colonnes parallèles lat / lon / props
+    (plus compact qu'une FeatureCollection GeoJSON: pas d'enveloppe Feature/geometry par point)
     """
-    
-    # Transformation en FeatureCollection GeoJSON
-    gj_features = []
+    lats: List[float] = []
+    lons: List[float] = []
+    props_list: List[Dict[str, Any]] = []
     for f in features:
-        lat = f.get("lat") or f.get("latitude")
-        lon = f.get("lon") or f.get("longitude")
+        lat = _first_not_none(f.get("lat"), f.get("latitude"))
+        lon = _first_not_none(f.get("lon"), f.get("longitude"))
         
         if lat is None or lon is None:
             continue
         
         props = {}
         for k, v in f.items():
-            if k in ("lat", "lon", "latitude", "longitude"):
+            if k in _COORD_KEYS:
                 continue
             if isinstance(v, (list, tuple)):
                 props[k] = [sanitize(x) for x in v]
@@ -42,16 +57,29 @@ def build_map_html(
             else:
                 props[k] = sanitize(v)
         
-        gj_features.append({
-            "type": "Feature",
-            "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
-            "properties": props
-        })
-    
-    feature_collection = {"type": "FeatureCollection", "features": gj_features}
-    gj_json = json.dumps(feature_collection, ensure_ascii=False)
+        lats.append(float(lat))
+        lons.append(float(lon))
+        props_list.append(props)
     
-    html_template = f"""<!doctype html>
+    return {"lat": lats, "lon": lons, "props": props_list}
+
+
+def build_update_script(
+    center_lat: float,
+    center_lon: float,
+    radius_m: int,
+    marker_columns: Dict[str, List[Any]]
+) -> str:
+    """
+    Construit l'appel JS qui remplace les marqueurs d'une carte déjà chargée
+    (évite de recharger toute la page et Leaflet)
+    """
+    gj_json = dumps_json(marker_columns)
+    return f"updateFeatures({gj_json}, [{center_lat:.7f}, {center_lon:.7f}], {radius_m});"
+
+
+# Page Leaflet de la carte (accolades JS doublées pour str.format)
+MAP_TEMPLATE = """<!doctype html>
 <html lang="fr">
 <head>
 <meta charset="utf-8" />
@@ -84,7 +112,7 @@ def build_map_html(
 <script>
   const CENTER = [{center_lat:.7f}, {center_lon:.7f}];
   const RADIUS_M = {radius_m};
-  const GEOJSON = {gj_json};
+  const MARKERS = {gj_json};
 
   // Fonds de carte
   const esriSat = L.tileLayer(
@@ -120,12 +148,13 @@ def build_map_html(
   map.fitBounds(circle.getBounds(), {{ padding: [20, 20] }});
 
   // Centre (marqueur)
-  L.circleMarker(CENTER, {{
+  const centerMarker = L.circleMarker(CENTER, {{
     radius: 6, color: '#dc2626', fillColor: '#dc2626', fillOpacity: 0.9
   }}).bindTooltip('Centre de recherche').addTo(map);
 
   // Cluster
   const markers = L.markerClusterGroup();
+  map.addLayer(markers);
 
   function esc(x) {{
     if (x === null || x === undefined) return '';
@@ -222,28 +251,70 @@ def build_map_html(
     return html;
   }}
 
-  const gj = L.geoJSON(GEOJSON, {{
-    onEachFeature: function (feature, layer) {{
-      const p = feature.properties || {{}};
-      layer.bindPopup(buildPopup(p), {{ maxWidth: 450 }});
+  // Remplace les marqueurs (appelée au chargement puis depuis Qt via runJavaScript)
+  function updateFeatures(data, center, radiusM) {{
+    if (center) {{
+      circle.setLatLng(center);
+      centerMarker.setLatLng(center);
     }}
-  }});
+    if (radiusM) circle.setRadius(radiusM);
 
-  markers.addLayer(gj);
-  map.addLayer(markers);
+    // Colonnes parallèles: une boucle indexée, sans objet Feature intermédiaire
+    const n = data.lat.length;
+    const layers = new Array(n);
+    const bounds = circle.getBounds();
+    for (let i = 0; i < n; i++) {{
+      const latlng = [data.lat[i], data.lon[i]];
+      layers[i] = L.marker(latlng).bindPopup(buildPopup(data.props[i] || {{}}), {{ maxWidth: 450 }});
+      bounds.extend(latlng);
+    }}
 
-  // Ajuster le zoom
-  try {{
-    const group = new L.featureGroup([circle, gj]);
-    map.fitBounds(group.getBounds(), {{ padding: [20,20] }});
-  }} catch(e) {{
-    map.fitBounds(circle.getBounds(), {{ padding: [20,20] }});
+    markers.clearLayers();
+    markers.addLayers(layers);
+
+    // Ajuster le zoom
+    map.fitBounds(bounds, {{ padding: [20,20] }});
   }}
+
+  updateFeatures(MARKERS);
 </script>
 </body>
 </html>
 """
-    return html_template
+
+# Gabarit découpé une seule fois autour des marqueurs: seule la tête (titre, centre, rayon)
+# est formatée à chaque carte, les données sont simplement concaténées
+_MAP_HEAD, _MAP_TAIL = MAP_TEMPLATE.split("{gj_json}")
+_MAP_TAIL = _MAP_TAIL.format()
+
+
+def build_map_html(
+    center_lat: float, 
+    center_lon: float, 
+    radius_m: int, 
+    features: List[Dict[str, Any]],
+    title: str = "Carte Prospection",
+    marker_columns: Optional[Dict[str, List[Any]]] = None
+) -> str:
+    """
+    Construit une page HTML Leaflet autonome avec:
+    - fond satellite Esri + OSM
+    - cercle du rayon
+    - clustering
+    - popups détaillées
+    - fonction JS updateFeatures() pour les mises à jour incrémentales
+    """
+    
+    # Transformation en colonnes lat / lon / props
+    if marker_columns is None:
+        marker_columns = build_marker_columns(features)
+    gj_json = dumps_json(marker_columns)
+    
+    return (
+        _MAP_HEAD.format(title=title, center_lat=center_lat, center_lon=center_lon, radius_m=radius_m)
+        + gj_json
+        + _MAP_TAIL
+    )
 
 
 def save_map_html(
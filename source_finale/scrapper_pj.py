@@ -4,7 +4,9 @@ import time
 import random
 import csv
 import os
-from typing import Optional, List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any, Callable
 
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -17,6 +19,10 @@ from address_comparator import AddressComparator
 from bdnb import BDNB
 
 
+# Nombre de navigateurs en parallèle (chaque thread pilote son propre Chrome)
+PJ_MAX_WORKERS = 3
+
+
 class ScrapperPagesJaunes:
     """Scrapper Pages Jaunes avec navigateur visible"""
     
@@ -264,3 +270,51 @@ class ScrapperPagesJaunes:
                     ])
         
         logger.both(f"Résultats PJ sauvegardés: {output_file}", "SUCCESS")
+
+
+def process_streets(
+    streets: List[Street],
+    logger: Logger,
+    output_dir: str,
+    max_workers: int = PJ_MAX_WORKERS,
+    on_street_done: Optional[Callable[[int, Street], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None
+) -> List[DataPJ]:
+    """
+    Traite plusieurs rues en parallèle.
+    Un driver Selenium n'est pas thread-safe : chaque thread du pool crée
+    son propre ScrapperPagesJaunes, et tous les navigateurs sont fermés à la fin.
+    Les résultats sont renvoyés dans l'ordre des rues.
+    """
+    local = threading.local()
+    scrappers: List[ScrapperPagesJaunes] = []
+    scrappers_lock = threading.Lock()
+
+    def _process(street: Street) -> List[DataPJ]:
+        if is_cancelled and is_cancelled():
+            return []
+        scrapper = getattr(local, 'scrapper', None)
+        if scrapper is None:
+            scrapper = ScrapperPagesJaunes()
+            local.scrapper = scrapper
+            with scrappers_lock:
+                scrappers.append(scrapper)
+        return scrapper.process_street(street, logger, output_dir)
+
+    results_by_street: List[List[DataPJ]] = [[] for _ in streets]
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_process, street): i for i, street in enumerate(streets)}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results_by_street[i] = future.result()
+                except Exception as e:
+                    logger.both(f"Erreur PJ sur la rue {streets[i]['name']}: {e}", "ERROR")
+                if on_street_done:
+                    on_street_done(done, streets[i])
+    finally:
+        for scrapper in scrappers:
+            scrapper.close_browser()
+
+    return [data for street_results in results_by_street for data in street_results]
@@ -1,5 +1,6 @@
 """Types et Variables communs à tous les modules"""
 
+import os
 from typing import TypedDict, Optional, List, Dict, Any
 
 
@@ -129,3 +130,15 @@ def safe_int(x, default=None):
         return int(x)
     except Exception:
         return default
+
+
+def has_json_file(directory: str) -> bool:
+    """Indique si un dossier contient au moins un fichier .json (arrêt au premier trouvé)"""
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):
+                    return True
+    except FileNotFoundError:
+        pass
+    return False
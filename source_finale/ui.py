@@ -8,48 +8,175 @@ Combine les workflows src_1 (Pages Jaunes) et src_2 (Entreprises)
 import os
 import sys
 import json
+import time
+import threading
+import traceback
 import webbrowser
 from typing import Optional, List
 
-from PySide6.QtCore import Qt, QThread, Signal, Slot, QUrl
+from PySide6.QtCore import (
+    Qt, QObject, QThread, QTimer, QRunnable, QThreadPool, Signal, Slot, QUrl
+)
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QDoubleSpinBox, QPushButton, QProgressBar,
     QMessageBox, QTabWidget, QFileDialog, QComboBox, QGroupBox,
     QFormLayout, QTextEdit, QSplitter, QListWidget, QListWidgetItem,
     QStackedWidget, QFrame, QSizePolicy, QScrollArea, QSpacerItem,
-    QMenuBar, QMenu
+    QMenuBar, QMenu, QStyle
 )
 from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtGui import QFont, QIcon, QAction
+from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+from PySide6.QtGui import QFont, QIcon, QAction, QTextCursor
 
 # Import des modules du projet
 from logger import Logger
-from tools import Address, Street
+from tools import Address, Street, has_json_file
 from address_processor import AddressProcessor
-from scrapper_pj import ScrapperPagesJaunes
+from scrapper_pj import process_streets
 from entreprises import EntrepriseSearcher
 from fusion import (
-    fuse_results, save_fused_csv, load_fused_csv, fused_to_map_features,
+    fuse_results, save_fused_csv, iter_fused_csv, fused_to_map_features,
     filter_results_by_zone_and_interest, save_filtered_results
 )
-from map_generator import build_map_html, save_map_html
+from cache import GeocodeCache, StreetsCache
+from map_generator import (
+    build_map_html, save_map_html, build_marker_columns, build_update_script
+)
+
+
+# Styles partagés des boutons secondaires (petits boutons et bouton Annuler)
+_SECONDARY_BTN_QSS = """
+    QPushButton {
+        background-color: #f1f5f9;
+        color: #475569;
+        padding: 8px 15px;
+        border-radius: 6px;
+        border: 1px solid #e2e8f0;
+    }
+    QPushButton:hover {
+        background-color: #e2e8f0;
+    }
+"""
+
+_CANCEL_BTN_QSS = """
+    QPushButton {
+        background-color: #f1f5f9;
+        color: #475569;
+        padding: 12px 25px;
+        font-size: 14px;
+        border-radius: 8px;
+        border: 1px solid #e2e8f0;
+    }
+    QPushButton:hover {
+        background-color: #e2e8f0;
+    }
+    QPushButton:disabled {
+        color: #cbd5e1;
+    }
+"""
+
+
+# Options des boîtes de dialogue fichiers : dialogue natif, sans icônes
+# personnalisées par dossier (évite un stat/lookup par entrée)
+_FILE_DIALOG_OPTIONS = QFileDialog.DontUseCustomDirectoryIcons
+_DIR_DIALOG_OPTIONS = (
+    QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks
+    | QFileDialog.DontUseCustomDirectoryIcons
+)
+
+
+# Profil web partagé (cache HTTP disque pour les tuiles et les assets Leaflet)
+_map_profile = None
+
+
+def get_map_profile() -> QWebEngineProfile:
+    """Retourne le profil web persistant partagé par les vues carte"""
+    global _map_profile
+    if _map_profile is None:
+        cache_dir = os.path.expanduser("~/.cache/je/web")
+        _map_profile = QWebEngineProfile("mapProfile", QApplication.instance())
+        _map_profile.setPersistentStoragePath(cache_dir)
+        _map_profile.setCachePath(cache_dir)
+        _map_profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        _map_profile.setHttpCacheMaximumSize(256 * 1024 * 1024)
+    return _map_profile
 
 
 # ==================== WORKER THREADS ====================
 
-class WorkerSignals:
+class WorkerSignals(QObject):
     """Signaux communs pour les workers"""
-    pass
+    result = Signal(object)
+    error = Signal(str, str)           # title, details
+
+
+class OutputDirCheckTask(QRunnable):
+    """Vérifie (et crée si besoin) le dossier de sortie hors du thread UI"""
+    
+    def __init__(self, output_dir: str):
+        super().__init__()
+        self.output_dir = output_dir
+        self.signals = WorkerSignals()
+    
+    def run(self):
+        try:
+            existed = os.path.exists(self.output_dir)
+            if not existed:
+                os.makedirs(self.output_dir, exist_ok=True)
+            self.signals.result.emit((self.output_dir, existed))
+        except Exception as e:
+            self.signals.error.emit("Erreur", f"Impossible de créer le dossier {self.output_dir}:\n{e}")
+
+
+def start_worker_thread(worker: QObject, parent: QObject) -> QThread:
+    """
+    Déplace un worker (QObject avec run() et done) dans un QThread dédié et le démarre.
+    Le thread garde sa boucle d'événements : il s'arrête dès que le worker émet done.
+    """
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.done.connect(thread.quit)
+    thread.start()
+    return thread
+
+
+# Threads encore actifs à la fermeture des pages, avec leur worker (références gardées
+# jusqu'à la sortie du processus pour que ni l'un ni l'autre ne soit détruit en cours d'exécution)
+_DETACHED_THREADS: List[tuple] = []
 
 
-class CompleteWorkflowWorker(QThread):
+def stop_worker_thread(thread: Optional[QThread], worker: Optional[QObject], timeout_ms: int):
+    """
+    Arrête le thread d'un worker déjà annulé. S'il tourne encore après timeout_ms
+    (requête PJ/BAN en cours), il est détaché de son parent : la destruction des widgets
+    ne le détruit pas, wait_detached_threads() attend sa fin avant la sortie.
+    """
+    if thread is None or not thread.isRunning():
+        return
+    thread.quit()
+    if thread.wait(timeout_ms):
+        return
+    thread.setParent(None)
+    _DETACHED_THREADS.append((thread, worker))
+
+
+def wait_detached_threads():
+    """Attend la fin des threads détachés (le worker est annulé, il s'arrête de lui-même)"""
+    for thread, _worker in _DETACHED_THREADS:
+        thread.wait()
+    _DETACHED_THREADS.clear()
+
+
+class CompleteWorkflowWorker(QObject):
     """Worker pour le workflow complet"""
     progress = Signal(int, int, str)  # current, total, message
     log_message = Signal(str, str)     # message, level
     map_ready = Signal(str)            # html content
     finished_success = Signal(str)     # output_dir
     error = Signal(str, str)           # title, details
+    done = Signal()                    # émis en fin de run, succès ou non
     
     # Poids des étapes pour la progression (total = 100%)
     # Étape 1: Géocodage (2%)
@@ -69,15 +196,22 @@ class CompleteWorkflowWorker(QThread):
         'map': 5
     }
     
-    def __init__(self, address: Address, radius_km: float, output_dir: str, parent=None):
+    def __init__(self, address: Address, radius_km: float, output_dir: str,
+                 address_processor: Optional[AddressProcessor] = None,
+                 entreprise_searcher: Optional[EntrepriseSearcher] = None,
+                 parent=None):
         super().__init__(parent)
         self.address = address
         self.radius_km = radius_km
         self.output_dir = output_dir
+        # Services partagés par la fenêtre principale (créés à la demande sinon)
+        self.address_processor = address_processor or AddressProcessor()
+        self.entreprise_searcher = entreprise_searcher or EntrepriseSearcher()
         self._cancelled = False
         self._current_progress = 0
     
     def cancel(self):
+        # Appelé directement depuis le thread UI : la boucle du worker est occupée par run()
         self._cancelled = True
     
     def _emit_progress(self, step: str, sub_progress: float, message: str):
@@ -92,7 +226,9 @@ class CompleteWorkflowWorker(QThread):
         self._current_progress = int(global_progress)
         self.progress.emit(self._current_progress, 100, message)
     
+    @Slot()
     def run(self):
+        logger = None
         try:
             # Logger personnalisé qui émet des signaux
             logger = SignalLogger(self.output_dir, self.log_message)
@@ -100,8 +236,18 @@ class CompleteWorkflowWorker(QThread):
             # Étape 1: Récupération des coordonnées (2%)
             self._emit_progress('geocoding', 0, "Etape 1/7 : Recuperation des coordonnees...")
             
-            address_processor = AddressProcessor()
-            coords = address_processor.address_to_coordinates(self.address, logger)
+            address_processor = self.address_processor
+            geocode_cache = GeocodeCache()
+            try:
+                coords = geocode_cache.get(self.address)
+                if coords:
+                    logger.log(f"Coordonnées de {self.address} lues depuis le cache")
+                else:
+                    coords = address_processor.address_to_coordinates(self.address, logger)
+                    if coords:
+                        geocode_cache.set(self.address, coords)
+            finally:
+                geocode_cache.close()
             
             if not coords:
                 self.error.emit("Erreur de géocodage", "Impossible de géocoder l'adresse.")
@@ -118,13 +264,19 @@ class CompleteWorkflowWorker(QThread):
             dir_street = os.path.join(self.output_dir, 'streets')
             os.makedirs(dir_street, exist_ok=True)
             
-            address_processor.get_streets_in_area(
-                center_lat=coords['latitude'],
-                center_lon=coords['longitude'],
-                radius_km=self.radius_km,
-                logger=logger,
-                dir_street=dir_street
-            )
+            streets_cache = StreetsCache()
+            if streets_cache.restore(coords['latitude'], coords['longitude'], self.radius_km, dir_street):
+                logger.both("Rues de la zone récupérées depuis le cache", "SUCCESS")
+            else:
+                saved_files = address_processor.get_streets_in_area(
+                    center_lat=coords['latitude'],
+                    center_lon=coords['longitude'],
+                    radius_km=self.radius_km,
+                    logger=logger,
+                    dir_street=dir_street
+                )
+                if saved_files and not self._cancelled:
+                    streets_cache.store(coords['latitude'], coords['longitude'], self.radius_km, dir_street)
             
             if self._cancelled:
                 return
@@ -142,19 +294,14 @@ class CompleteWorkflowWorker(QThread):
             # Étape 3: Scrapping Pages Jaunes (50%)
             self._emit_progress('pj_scrapping', 0, f"Etape 3/7 : Scrapping Pages Jaunes (0/{total_streets})...")
             
-            scrapper = ScrapperPagesJaunes()
-            pj_results = []
-            
-            try:
-                for i, street in enumerate(streets):
-                    if self._cancelled:
-                        break
-                    sub_progress = (i + 1) / total_streets
-                    self._emit_progress('pj_scrapping', sub_progress, f"Etape 3/7 : PJ ({i + 1}/{total_streets}) - {street['name']}")
-                    results = scrapper.process_street(street, logger, self.output_dir)
-                    pj_results.extend(results)
-            finally:
-                scrapper.close_browser()
+            pj_results = process_streets(
+                streets, logger, self.output_dir,
+                on_street_done=lambda done, street: self._emit_progress(
+                    'pj_scrapping', done / total_streets,
+                    f"Etape 3/7 : PJ ({done}/{total_streets}) - {street['name']}"
+                ),
+                is_cancelled=lambda: self._cancelled
+            )
             
             if self._cancelled:
                 return
@@ -165,7 +312,7 @@ class CompleteWorkflowWorker(QThread):
             # - Enrichissement des résultats PJ avec données entreprises
             self._emit_progress('entreprises', 0, f"Etape 4/7 : Enrichissement entreprises...")
             
-            entreprise_searcher = EntrepriseSearcher()
+            entreprise_searcher = self.entreprise_searcher
             entreprise_results = []
             
             # 4a: Enrichir les résultats PJ (50% de l'étape)
@@ -244,17 +391,22 @@ class CompleteWorkflowWorker(QThread):
             self.finished_success.emit(self.output_dir)
             
         except Exception as e:
-            import traceback
             self.error.emit("Erreur", f"{e}\n\n{traceback.format_exc()}")
+        finally:
+            if logger:
+                logger.flush()
+                logger.close()
+            self.done.emit()
 
 
-class FromFolderWorker(QThread):
+class FromFolderWorker(QObject):
     """Worker pour reprendre depuis un dossier"""
     progress = Signal(int, int, str)
     log_message = Signal(str, str)
     map_ready = Signal(str)
     finished_success = Signal(str)
     error = Signal(str, str)
+    done = Signal()                    # émis en fin de run, succès ou non
     
     # Poids des étapes pour la progression (total = 100%)
     # Étape 1: Chargement rues (5%)
@@ -272,13 +424,20 @@ class FromFolderWorker(QThread):
         'map': 5
     }
     
-    def __init__(self, folder_path: str, parent=None):
+    def __init__(self, folder_path: str,
+                 address_processor: Optional[AddressProcessor] = None,
+                 entreprise_searcher: Optional[EntrepriseSearcher] = None,
+                 parent=None):
         super().__init__(parent)
         self.folder_path = folder_path
+        # Services partagés par la fenêtre principale (créés à la demande sinon)
+        self.address_processor = address_processor or AddressProcessor()
+        self.entreprise_searcher = entreprise_searcher or EntrepriseSearcher()
         self._cancelled = False
         self._current_progress = 0
     
     def cancel(self):
+        # Appelé directement depuis le thread UI : la boucle du worker est occupée par run()
         self._cancelled = True
     
     def _emit_progress(self, step: str, sub_progress: float, message: str):
@@ -291,7 +450,9 @@ class FromFolderWorker(QThread):
         self._current_progress = int(global_progress)
         self.progress.emit(self._current_progress, 100, message)
     
+    @Slot()
     def run(self):
+        logger = None
         try:
             logger = SignalLogger(self.folder_path, self.log_message)
             
@@ -304,7 +465,7 @@ class FromFolderWorker(QThread):
                 self.error.emit("Erreur", f"Pas de dossier 'streets' dans {self.folder_path}")
                 return
             
-            address_processor = AddressProcessor()
+            address_processor = self.address_processor
             streets = address_processor.load_all_streets_from_dir(dir_street, logger)
             
             if not streets:
@@ -315,37 +476,41 @@ class FromFolderWorker(QThread):
             
             # Trouver le centre
             center_lat, center_lon = None, None
-            for street in streets:
-                if street.get("numbers"):
-                    geo = address_processor.address_to_coordinates({
-                        "numero": street['numbers'][0],
-                        "voie": street['name'],
-                        "code_postal": street['postal_code'],
-                        "ville": street['city']
-                    }, logger)
-                    if geo:
-                        center_lat = geo['latitude']
-                        center_lon = geo['longitude']
-                        break
+            geocode_cache = GeocodeCache()
+            try:
+                for street in streets:
+                    if street.get("numbers"):
+                        center_address = {
+                            "numero": street['numbers'][0],
+                            "voie": street['name'],
+                            "code_postal": street['postal_code'],
+                            "ville": street['city']
+                        }
+                        geo = geocode_cache.get(center_address)
+                        if not geo:
+                            geo = address_processor.address_to_coordinates(center_address, logger)
+                            if geo:
+                                geocode_cache.set(center_address, geo)
+                        if geo:
+                            center_lat = geo['latitude']
+                            center_lon = geo['longitude']
+                            break
+            finally:
+                geocode_cache.close()
             
             self._emit_progress('loading', 1.0, f"{total_streets} rues chargees")
             
             # Étape 2: Scrapping PJ (50%)
             self._emit_progress('pj_scrapping', 0, f"Etape 2/6 : Scrapping Pages Jaunes (0/{total_streets})...")
             
-            scrapper = ScrapperPagesJaunes()
-            pj_results = []
-            
-            try:
-                for i, street in enumerate(streets):
-                    if self._cancelled:
-                        break
-                    sub_progress = (i + 1) / total_streets
-                    self._emit_progress('pj_scrapping', sub_progress, f"Etape 2/6 : PJ ({i + 1}/{total_streets}) - {street['name']}")
-                    results = scrapper.process_street(street, logger, self.folder_path)
-                    pj_results.extend(results)
-            finally:
-                scrapper.close_browser()
+            pj_results = process_streets(
+                streets, logger, self.folder_path,
+                on_street_done=lambda done, street: self._emit_progress(
+                    'pj_scrapping', done / total_streets,
+                    f"Etape 2/6 : PJ ({done}/{total_streets}) - {street['name']}"
+                ),
+                is_cancelled=lambda: self._cancelled
+            )
             
             if self._cancelled:
                 return
@@ -354,7 +519,7 @@ class FromFolderWorker(QThread):
             # Cette étape enrichit les résultats PJ avec données entreprises
             self._emit_progress('entreprises', 0, f"Etape 3/6 : Enrichissement entreprises...")
             
-            entreprise_searcher = EntrepriseSearcher()
+            entreprise_searcher = self.entreprise_searcher
             entreprise_results = []
             
             # Enrichir les résultats PJ
@@ -425,25 +590,167 @@ class FromFolderWorker(QThread):
             self.finished_success.emit(self.folder_path)
             
         except Exception as e:
-            import traceback
+            self.error.emit("Erreur", f"{e}\n\n{traceback.format_exc()}")
+        finally:
+            if logger:
+                logger.flush()
+                logger.close()
+            self.done.emit()
+
+
+class MapBuildWorker(QThread):
+    """Worker qui génère et écrit le fichier carte hors du thread UI"""
+    map_saved = Signal(str, str)       # chemin du fichier carte, script JS de mise à jour
+    error = Signal(str, str)           # title, details
+    
+    def __init__(self, center_lat: float, center_lon: float, features: List[dict],
+                 map_file: str, title: str = "Prospection", radius_m: int = 500, parent=None):
+        super().__init__(parent)
+        self.center_lat = center_lat
+        self.center_lon = center_lon
+        self.features = features
+        self.map_file = map_file
+        self.title = title
+        self.radius_m = radius_m
+    
+    def prepare(self) -> bool:
+        """Prépare les features avant génération (surchargé par les sous-classes)"""
+        return True
+    
+    def run(self):
+        try:
+            if not self.prepare():
+                return
+            marker_columns = build_marker_columns(self.features)
+            html = build_map_html(
+                center_lat=self.center_lat,
+                center_lon=self.center_lon,
+                radius_m=self.radius_m,
+                features=self.features,
+                title=self.title,
+                marker_columns=marker_columns
+            )
+            with open(self.map_file, 'w', encoding='utf-8') as f:
+                f.write(html)
+            script = build_update_script(
+                self.center_lat, self.center_lon, self.radius_m, marker_columns
+            )
+            self.map_saved.emit(self.map_file, script)
+        except Exception as e:
             self.error.emit("Erreur", f"{e}\n\n{traceback.format_exc()}")
 
 
+class CsvMapWorker(MapBuildWorker):
+    """Worker qui lit un CSV fusionné par blocs puis génère la carte"""
+    progress = Signal(int, int)        # octets lus, taille totale
+    no_data = Signal(str)              # message d'avertissement
+    
+    def __init__(self, csv_file: str, map_file: str, title: str = "Carte depuis CSV",
+                 radius_m: int = 500, parent=None):
+        super().__init__(0.0, 0.0, [], map_file, title=title, radius_m=radius_m, parent=parent)
+        self.csv_file = csv_file
+    
+    def prepare(self) -> bool:
+        # Un seul passage : filtrage, somme des coordonnées et liste des features.
+        # Seules les lignes géolocalisées sont conservées en mémoire.
+        sum_lat = sum_lon = 0.0
+        rows = 0
+        features = []
+        for chunk, processed, total in iter_fused_csv(self.csv_file):
+            rows += len(chunk)
+            for d in chunk:
+                lat = d.get("latitude")
+                lon = d.get("longitude")
+                if not lat or not lon:
+                    continue
+                sum_lat += lat
+                sum_lon += lon
+                features.append(d)
+            self.progress.emit(processed, total)
+        
+        if not rows:
+            self.no_data.emit("Aucune donnée dans le CSV.")
+            return False
+        if not features:
+            self.no_data.emit("Aucune coordonnée valide.")
+            return False
+        
+        self.features = features
+        self.center_lat = sum_lat / len(features)
+        self.center_lon = sum_lon / len(features)
+        return True
+
+
 class SignalLogger(Logger):
-    """Logger qui émet des signaux Qt en plus du fichier"""
+    """
+    Logger qui émet des signaux Qt en plus du fichier.
+    Les messages sont regroupés et émis en un seul signal 'BATCH'
+    (toutes les 32 lignes ou au plus tard après 50 ms).
+    """
+    BATCH_SIZE = 32
+    BATCH_DELAY = 0.05
+    # Séparateur des lignes d'un lot (absent des messages, contrairement à '<br>' ou '\n')
+    BATCH_SEPARATOR = "\x1e"
+    
     def __init__(self, output_dir: str, signal):
         super().__init__(os.path.join(output_dir, 'log.txt'))
         self.signal = signal
+        self._buffer: List[str] = []
+        self._buffer_lock = threading.Lock()
+        # Couvre l'échange du tampon ET l'émission : les lots partent dans l'ordre
+        self._emit_lock = threading.Lock()
+        self._pending = threading.Event()
+        self._closed = threading.Event()
+        self._last_flush = time.monotonic()
+        # Un seul thread de vidage pour toute la durée du logger
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
     
     def console(self, message: str, level: str = "INFO"):
         # Émet seulement le signal, pas d'appel au parent pour éviter les doublons
-        self.signal.emit(message, level)
+        self._enqueue(message, level)
     
     def both(self, message: str, level: str = "INFO"):
         # Écrit dans le fichier log
         self.log(message, level)
         # Émet le signal pour l'UI
-        self.signal.emit(message, level)
+        self._enqueue(message, level)
+    
+    def _enqueue(self, message: str, level: str):
+        with self._buffer_lock:
+            self._buffer.append(LogViewer.format_line(message, level))
+            due = (len(self._buffer) >= self.BATCH_SIZE
+                   or time.monotonic() - self._last_flush >= self.BATCH_DELAY)
+        if due:
+            self.flush()
+        else:
+            self._pending.set()
+    
+    def _flush_loop(self):
+        # Garantit l'affichage des derniers messages même si le flux s'arrête
+        while True:
+            self._pending.wait()
+            if self._closed.wait(self.BATCH_DELAY):
+                return
+            self._pending.clear()
+            self.flush()
+    
+    def flush(self):
+        """Émet les messages en attente en un seul signal"""
+        with self._emit_lock:
+            with self._buffer_lock:
+                lines, self._buffer = self._buffer, []
+                self._last_flush = time.monotonic()
+            if lines:
+                self.signal.emit(self.BATCH_SEPARATOR.join(lines), "BATCH")
+    
+    def close(self):
+        """Arrête le thread de vidage, émet le reste puis ferme le fichier"""
+        self._closed.set()
+        self._pending.set()
+        self._flusher.join()
+        self.flush()
+        super().close()
 
 
 # ==================== WIDGETS ====================
@@ -533,6 +840,78 @@ class SearchParamsForm(QGroupBox):
         return self.folder_edit.text().strip()
 
 
+class StatusLabel(QLabel):
+    """Label de statut dont la couleur suit l'état (idle / success / error)"""
+    
+    def __init__(self, text: str = "", parent=None):
+        super().__init__(text, parent)
+        self.setObjectName("statusLabelIdle")
+    
+    def set_state(self, state: str):
+        """Change l'état via l'objectName et repolit le widget si nécessaire"""
+        name = "statusLabel" + state.capitalize()
+        if self.objectName() == name:
+            return
+        self.setObjectName(name)
+        self.style().unpolish(self)
+        self.style().polish(self)
+
+
+class ProgressThrottler(QObject):
+    """Regroupe les mises à jour de progression et ne les applique qu'à intervalle fixe"""
+    
+    def __init__(self, progress_bar: QProgressBar, status_label: QLabel,
+                 interval_ms: int = 50, parent=None):
+        super().__init__(parent)
+        self.progress_bar = progress_bar
+        self.status_label = status_label
+        self._pending = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+    
+    def start(self):
+        self._pending = None
+        self._timer.start()
+    
+    def stop(self):
+        """Applique la dernière mise à jour en attente puis arrête le timer"""
+        self.flush()
+        self._timer.stop()
+    
+    def update(self, current: int, total: int, message: str):
+        # Seule la dernière valeur reçue pendant l'intervalle est conservée
+        self._pending = (current, total, message)
+    
+    @Slot()
+    def flush(self):
+        if self._pending is None:
+            return
+        current, total, message = self._pending
+        self._pending = None
+        # setRange relance l'animation et force un repaint : seulement si la plage change
+        if total <= 0:
+            if self.progress_bar.maximum() != 0:
+                self.progress_bar.setRange(0, 0)
+        else:
+            if self.progress_bar.maximum() != total:
+                self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(current)
+        self.status_label.setText(message)
+
+
+# Couleur des messages du journal selon le niveau (balise ouvrante pré-construite)
+_LOG_COLORS = {
+    "SUCCESS": "#22c55e",
+    "ERROR": "#ef4444",
+    "WARNING": "#f59e0b",
+    "PROGRESS": "#3b82f6",
+    "INFO": "#6b7280"
+}
+_LOG_SPAN_OPEN = {level: f'<span style="color: {color}">' for level, color in _LOG_COLORS.items()}
+_LOG_SPAN_DEFAULT = _LOG_SPAN_OPEN["INFO"]
+
+
 class LogViewer(QTextEdit):
     """Widget d'affichage des logs"""
     
@@ -541,20 +920,27 @@ class LogViewer(QTextEdit):
         self.setReadOnly(True)
         self.setFont(QFont("Monospace", 9))
         self.setMaximumHeight(150)
+        # Limite la taille du document : les plus anciens blocs sont supprimés
+        self.document().setMaximumBlockCount(2000)
+    
+    @staticmethod
+    def format_line(message: str, level: str) -> str:
+        return _LOG_SPAN_OPEN.get(level, _LOG_SPAN_DEFAULT) + message + '</span>'
     
     @Slot(str, str)
     def append_log(self, message: str, level: str):
-        color = {
-            "SUCCESS": "#22c55e",
-            "ERROR": "#ef4444",
-            "WARNING": "#f59e0b",
-            "PROGRESS": "#3b82f6",
-            "INFO": "#6b7280"
-        }.get(level, "#6b7280")
-        
-        self.append(f'<span style="color: {color}">{message}</span>')
+        if level == "BATCH":
+            # Lignes déjà formatées par SignalLogger : un bloc par ligne (la limite de
+            # 2000 blocs compte des lignes), regroupés en une seule modification du document
+            cursor = self.textCursor()
+            cursor.beginEditBlock()
+            for line in message.split(SignalLogger.BATCH_SEPARATOR):
+                self.append(line)
+            cursor.endEditBlock()
+        else:
+            self.append(self.format_line(message, level))
         # Auto-scroll
-        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+        self.moveCursor(QTextCursor.End)
 
 
 # ==================== PAGES ====================
@@ -564,9 +950,18 @@ class CompletePage(QWidget):
     
     map_ready = Signal(str)
     
-    def __init__(self, parent=None):
+    def __init__(self, address_processor: Optional[AddressProcessor] = None,
+                 entreprise_searcher: Optional[EntrepriseSearcher] = None,
+                 parent=None):
         super().__init__(parent)
         self.worker = None
+        self.worker_thread: Optional[QThread] = None
+        self.address_processor = address_processor
+        self.entreprise_searcher = entreprise_searcher
+        # Dernier dossier de sortie vérifié pendant la session : il existe forcément
+        # (créé par la vérification au besoin), seul l'accès disque est évité
+        self._known_existing_dir: Optional[str] = None
+        self._pending_address: Optional[Address] = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -621,22 +1016,7 @@ class CompletePage(QWidget):
         btn_layout.addWidget(self.start_btn)
         
         self.cancel_btn = QPushButton("Annuler")
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f1f5f9;
-                color: #475569;
-                padding: 12px 25px;
-                font-size: 14px;
-                border-radius: 8px;
-                border: 1px solid #e2e8f0;
-            }
-            QPushButton:hover {
-                background-color: #e2e8f0;
-            }
-            QPushButton:disabled {
-                color: #cbd5e1;
-            }
-        """)
+        self.cancel_btn.setStyleSheet(_CANCEL_BTN_QSS)
         self.cancel_btn.setEnabled(False)
         self.cancel_btn.clicked.connect(self.cancel_workflow)
         btn_layout.addWidget(self.cancel_btn)
@@ -654,9 +1034,9 @@ class CompletePage(QWidget):
         self.progress.setMaximumHeight(10)
         progress_layout.addWidget(self.progress)
         
-        self.status_label = QLabel("En attente...")
-        self.status_label.setStyleSheet("color: #64748b; font-size: 13px;")
+        self.status_label = StatusLabel("En attente...")
         progress_layout.addWidget(self.status_label)
+        self.progress_throttler = ProgressThrottler(self.progress, self.status_label, parent=self)
         
         layout.addWidget(progress_group)
         
@@ -672,30 +1052,74 @@ class CompletePage(QWidget):
         layout.addStretch()
     
     @Slot()
-    def start_workflow(self):
+    def validate_inputs(self) -> Optional[tuple]:
+        """
+        Vérifie les champs du formulaire (sans accès disque).
+        Retourne (adresse, dossier de sortie) ou None si la saisie est incomplète.
+        """
         address = self.address_form.get_address()
         if not address:
             QMessageBox.warning(self, "Erreur", "Veuillez remplir tous les champs de l'adresse.")
-            return
+            return None
         
         folder_name = self.params_form.get_folder_name()
         if not folder_name:
             QMessageBox.warning(self, "Erreur", "Veuillez entrer un nom de dossier.")
-            return
-        
-        output_dir = os.path.join('output', folder_name)
+            return None
         
-        if os.path.exists(output_dir):
-            reply = QMessageBox.question(
-                self, "Dossier existant",
-                f"Le dossier '{folder_name}' existe déjà. Continuer ?",
-                QMessageBox.Yes | QMessageBox.No
-            )
-            if reply == QMessageBox.No:
-                return
+        return address, os.path.join('output', folder_name)
+    
+    def start_workflow(self):
+        inputs = self.validate_inputs()
+        if not inputs:
+            return
+        address, output_dir = inputs
         
-        os.makedirs(output_dir, exist_ok=True)
+        # Dossier déjà vérifié pendant cette session : pas de nouvel accès disque,
+        # mais la confirmation d'écrasement reste demandée
+        if output_dir == self._known_existing_dir:
+            if self.confirm_existing_dir(output_dir):
+                self.launch_worker(address, output_dir)
+            return
         
+        # Vérification du dossier dans le pool de threads (montage réseau lent, etc.)
+        self.start_btn.setEnabled(False)
+        self.status_label.setText("Verification du dossier de sortie...")
+        self._pending_address = address
+        task = OutputDirCheckTask(output_dir)
+        task.signals.result.connect(self.on_output_dir_checked)
+        task.signals.error.connect(self.on_output_dir_error)
+        QThreadPool.globalInstance().start(task)
+    
+    @Slot(object)
+    def on_output_dir_checked(self, result: tuple):
+        output_dir, existed = result
+        address = self._pending_address
+        self._known_existing_dir = output_dir
+        if existed and not self.confirm_existing_dir(output_dir):
+            return
+        self.launch_worker(address, output_dir)
+    
+    def confirm_existing_dir(self, output_dir: str) -> bool:
+        """Demande confirmation avant d'écrire dans un dossier existant"""
+        reply = QMessageBox.question(
+            self, "Dossier existant",
+            f"Le dossier '{os.path.basename(output_dir)}' existe déjà. Continuer ?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.No:
+            self.start_btn.setEnabled(True)
+            self.status_label.setText("En attente...")
+            return False
+        return True
+    
+    @Slot(str, str)
+    def on_output_dir_error(self, title: str, details: str):
+        self.start_btn.setEnabled(True)
+        self.status_label.setText("En attente...")
+        QMessageBox.critical(self, title, details)
+    
+    def launch_worker(self, address: Address, output_dir: str):
         radius = self.params_form.get_radius()
         
         self.start_btn.setEnabled(False)
@@ -703,13 +1127,19 @@ class CompletePage(QWidget):
         self.log_viewer.clear()
         self.progress.setRange(0, 0)
         
-        self.worker = CompleteWorkflowWorker(address, radius, output_dir)
+        self.worker = CompleteWorkflowWorker(
+            address, radius, output_dir,
+            address_processor=self.address_processor,
+            entreprise_searcher=self.entreprise_searcher
+        )
         self.worker.progress.connect(self.on_progress)
         self.worker.log_message.connect(self.log_viewer.append_log)
         self.worker.map_ready.connect(self.on_map_ready)
         self.worker.finished_success.connect(self.on_finished)
         self.worker.error.connect(self.on_error)
-        self.worker.start()
+        self.progress_throttler.start()
+        self.worker_thread = start_worker_thread(self.worker, self)
+        self.worker_thread.finished.connect(self.progress_throttler.stop)
     
     @Slot()
     def cancel_workflow(self):
@@ -717,14 +1147,15 @@ class CompletePage(QWidget):
             self.worker.cancel()
         self.cancel_btn.setEnabled(False)
     
+    def shutdown(self, timeout_ms: int = 3000):
+        """Annule le traitement en cours et attend (au plus timeout_ms) la fin du thread"""
+        if self.worker:
+            self.worker.cancel()
+        stop_worker_thread(self.worker_thread, self.worker, timeout_ms)
+    
     @Slot(int, int, str)
     def on_progress(self, current: int, total: int, message: str):
-        if total <= 0:
-            self.progress.setRange(0, 0)
-        else:
-            self.progress.setRange(0, total)
-            self.progress.setValue(current)
-        self.status_label.setText(message)
+        self.progress_throttler.update(current, total, message)
     
     @Slot(str)
     def on_map_ready(self, html: str):
@@ -734,10 +1165,11 @@ class CompletePage(QWidget):
     def on_finished(self, output_dir: str):
         self.start_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
+        self.progress_throttler.stop()
         self.progress.setRange(0, 100)
         self.progress.setValue(100)
         self.status_label.setText("Recherche terminee avec succes")
-        self.status_label.setStyleSheet("color: #22c55e; font-size: 13px; font-weight: bold;")
+        self.status_label.set_state("success")
         
         QMessageBox.information(
             self, "Succès",
@@ -748,10 +1180,11 @@ class CompletePage(QWidget):
     def on_error(self, title: str, details: str):
         self.start_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
+        self.progress_throttler.stop()
         self.progress.setRange(0, 100)
         self.progress.setValue(0)
         self.status_label.setText("Une erreur s'est produite")
-        self.status_label.setStyleSheet("color: #ef4444; font-size: 13px; font-weight: bold;")
+        self.status_label.set_state("error")
         
         QMessageBox.critical(self, title, details)
 
@@ -761,9 +1194,21 @@ class FromFolderPage(QWidget):
     
     map_ready = Signal(str)
     
-    def __init__(self, parent=None):
+    def __init__(self, address_processor: Optional[AddressProcessor] = None,
+                 entreprise_searcher: Optional[EntrepriseSearcher] = None,
+                 parent=None):
         super().__init__(parent)
         self.worker = None
+        self.worker_thread: Optional[QThread] = None
+        self.address_processor = address_processor
+        self.entreprise_searcher = entreprise_searcher
+        # Cache du scan des dossiers : chemin -> (mtime_ns de streets/, has_streets)
+        self._streets_cache: dict[str, tuple[int, bool]] = {}
+        # Racine des dossiers listés : le chemin se déduit du texte de l'item
+        self._folder_root = 'output'
+        self._icon_ok = self.style().standardIcon(QStyle.SP_DialogYesButton)
+        self._icon_missing = self.style().standardIcon(QStyle.SP_DialogNoButton)
+        self._icon_browsed = self.style().standardIcon(QStyle.SP_DirLinkIcon)
         self.setup_ui()
     
     def setup_ui(self):
@@ -795,34 +1240,12 @@ class FromFolderPage(QWidget):
         btn_row.setSpacing(10)
         
         refresh_btn = QPushButton("Rafraichir")
-        refresh_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f1f5f9;
-                color: #475569;
-                padding: 8px 15px;
-                border-radius: 6px;
-                border: 1px solid #e2e8f0;
-            }
-            QPushButton:hover {
-                background-color: #e2e8f0;
-            }
-        """)
+        refresh_btn.setStyleSheet(_SECONDARY_BTN_QSS)
         refresh_btn.clicked.connect(self.refresh_folder_list)
         btn_row.addWidget(refresh_btn)
         
         browse_btn = QPushButton("Parcourir...")
-        browse_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f1f5f9;
-                color: #475569;
-                padding: 8px 15px;
-                border-radius: 6px;
-                border: 1px solid #e2e8f0;
-            }
-            QPushButton:hover {
-                background-color: #e2e8f0;
-            }
-        """)
+        browse_btn.setStyleSheet(_SECONDARY_BTN_QSS)
         browse_btn.clicked.connect(self.browse_folder)
         btn_row.addWidget(browse_btn)
         
@@ -861,22 +1284,7 @@ class FromFolderPage(QWidget):
         action_layout.addWidget(self.start_btn)
         
         self.cancel_btn = QPushButton("Annuler")
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f1f5f9;
-                color: #475569;
-                padding: 12px 25px;
-                font-size: 14px;
-                border-radius: 8px;
-                border: 1px solid #e2e8f0;
-            }
-            QPushButton:hover {
-                background-color: #e2e8f0;
-            }
-            QPushButton:disabled {
-                color: #cbd5e1;
-            }
-        """)
+        self.cancel_btn.setStyleSheet(_CANCEL_BTN_QSS)
         self.cancel_btn.setEnabled(False)
         self.cancel_btn.clicked.connect(self.cancel_processing)
         action_layout.addWidget(self.cancel_btn)
@@ -894,9 +1302,9 @@ class FromFolderPage(QWidget):
         self.progress.setMaximumHeight(10)
         progress_layout.addWidget(self.progress)
         
-        self.status_label = QLabel("En attente de sélection...")
-        self.status_label.setStyleSheet("color: #64748b; font-size: 13px;")
+        self.status_label = StatusLabel("En attente de sélection...")
         progress_layout.addWidget(self.status_label)
+        self.progress_throttler = ProgressThrottler(self.progress, self.status_label, parent=self)
         
         layout.addWidget(progress_group)
         
@@ -914,33 +1322,48 @@ class FromFolderPage(QWidget):
     def refresh_folder_list(self):
         self.folder_list.clear()
         
-        output_dir = 'output'
-        if not os.path.exists(output_dir):
+        output_dir = self._folder_root
+        try:
+            with os.scandir(output_dir) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except FileNotFoundError:
             return
         
-        for folder in sorted(os.listdir(output_dir)):
-            folder_path = os.path.join(output_dir, folder)
-            if not os.path.isdir(folder_path):
+        items = []
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
                 continue
+            folder_path = entry.path
             
             streets_dir = os.path.join(folder_path, 'streets')
-            has_streets = os.path.exists(streets_dir) and any(
-                f.endswith('.json') for f in os.listdir(streets_dir)
-            ) if os.path.exists(streets_dir) else False
+            try:
+                # Le mtime de streets/ change des qu'un fichier y est ajoute ou retire
+                key = os.stat(streets_dir).st_mtime_ns
+            except FileNotFoundError:
+                has_streets = False
+            else:
+                cached = self._streets_cache.get(folder_path)
+                if cached and cached[0] == key:
+                    has_streets = cached[1]
+                else:
+                    has_streets = has_json_file(streets_dir)
+                    self._streets_cache[folder_path] = (key, has_streets)
             
-            status = "✓" if has_streets else "○"
-            item = QListWidgetItem(f"{status} {folder}")
-            item.setData(Qt.UserRole, folder_path)
+            item = QListWidgetItem(self._icon_ok if has_streets else self._icon_missing, entry.name)
+            items.append(item)
+        
+        for item in items:
             self.folder_list.addItem(item)
     
     def browse_folder(self):
         folder = QFileDialog.getExistingDirectory(
             self, "Sélectionner un dossier",
-            'output' if os.path.exists('output') else '.'
+            'output' if os.path.exists('output') else '.',
+            options=_DIR_DIALOG_OPTIONS
         )
         if folder:
             # Ajouter à la liste
-            item = QListWidgetItem(f"> {os.path.basename(folder)}")
+            item = QListWidgetItem(self._icon_browsed, os.path.basename(folder))
             item.setData(Qt.UserRole, folder)
             self.folder_list.addItem(item)
             self.folder_list.setCurrentItem(item)
@@ -952,20 +1375,27 @@ class FromFolderPage(QWidget):
             QMessageBox.warning(self, "Erreur", "Veuillez sélectionner un dossier.")
             return
         
-        folder_path = current.data(Qt.UserRole)
+        # Seuls les dossiers ajoutés via "Parcourir" portent leur chemin complet
+        folder_path = current.data(Qt.UserRole) or os.path.join(self._folder_root, current.text())
         
         self.start_btn.setEnabled(False)
         self.cancel_btn.setEnabled(True)
         self.log_viewer.clear()
         self.progress.setRange(0, 0)
         
-        self.worker = FromFolderWorker(folder_path)
+        self.worker = FromFolderWorker(
+            folder_path,
+            address_processor=self.address_processor,
+            entreprise_searcher=self.entreprise_searcher
+        )
         self.worker.progress.connect(self.on_progress)
         self.worker.log_message.connect(self.log_viewer.append_log)
         self.worker.map_ready.connect(self.on_map_ready)
         self.worker.finished_success.connect(self.on_finished)
         self.worker.error.connect(self.on_error)
-        self.worker.start()
+        self.progress_throttler.start()
+        self.worker_thread = start_worker_thread(self.worker, self)
+        self.worker_thread.finished.connect(self.progress_throttler.stop)
     
     @Slot()
     def cancel_processing(self):
@@ -973,14 +1403,15 @@ class FromFolderPage(QWidget):
             self.worker.cancel()
         self.cancel_btn.setEnabled(False)
     
+    def shutdown(self, timeout_ms: int = 3000):
+        """Annule le traitement en cours et attend (au plus timeout_ms) la fin du thread"""
+        if self.worker:
+            self.worker.cancel()
+        stop_worker_thread(self.worker_thread, self.worker, timeout_ms)
+    
     @Slot(int, int, str)
     def on_progress(self, current: int, total: int, message: str):
-        if total <= 0:
-            self.progress.setRange(0, 0)
-        else:
-            self.progress.setRange(0, total)
-            self.progress.setValue(current)
-        self.status_label.setText(message)
+        self.progress_throttler.update(current, total, message)
     
     @Slot(str)
     def on_map_ready(self, html: str):
@@ -990,10 +1421,11 @@ class FromFolderPage(QWidget):
     def on_finished(self, output_dir: str):
         self.start_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
+        self.progress_throttler.stop()
         self.progress.setRange(0, 100)
         self.progress.setValue(100)
         self.status_label.setText("Traitement termine avec succes")
-        self.status_label.setStyleSheet("color: #22c55e; font-size: 13px; font-weight: bold;")
+        self.status_label.set_state("success")
         
         QMessageBox.information(self, "Succes", f"Traitement termine!\n\nDossier: {output_dir}")
     
@@ -1001,10 +1433,11 @@ class FromFolderPage(QWidget):
     def on_error(self, title: str, details: str):
         self.start_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
+        self.progress_throttler.stop()
         self.progress.setRange(0, 100)
         self.progress.setValue(0)
         self.status_label.setText("Une erreur s'est produite")
-        self.status_label.setStyleSheet("color: #ef4444; font-size: 13px; font-weight: bold;")
+        self.status_label.set_state("error")
         
         QMessageBox.critical(self, title, details)
 
@@ -1015,6 +1448,10 @@ class MapPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_file = None
+        self.map_worker = None
+        # Vrai quand la page affichée est une carte générée (updateFeatures disponible)
+        self._leaflet_loaded = False
+        self._expect_leaflet = False
         self.setup_ui()
     
     def setup_ui(self):
@@ -1041,19 +1478,17 @@ class MapPage(QWidget):
         
         toolbar_layout.addStretch()
         
+        self.status_label = StatusLabel("")
+        toolbar_layout.addWidget(self.status_label)
+        
+        self.csv_progress = QProgressBar()
+        self.csv_progress.setTextVisible(False)
+        self.csv_progress.setFixedSize(150, 10)
+        self.csv_progress.hide()
+        toolbar_layout.addWidget(self.csv_progress)
+        
         open_file_btn = QPushButton("Ouvrir un fichier")
-        open_file_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f1f5f9;
-                color: #475569;
-                padding: 8px 15px;
-                border-radius: 6px;
-                border: 1px solid #e2e8f0;
-            }
-            QPushButton:hover {
-                background-color: #e2e8f0;
-            }
-        """)
+        open_file_btn.setStyleSheet(_SECONDARY_BTN_QSS)
         open_file_btn.setCursor(Qt.PointingHandCursor)
         open_file_btn.clicked.connect(self.open_file)
         toolbar_layout.addWidget(open_file_btn)
@@ -1077,10 +1512,37 @@ class MapPage(QWidget):
         
         layout.addWidget(toolbar)
         
-        # WebView
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml(self.get_placeholder_html())
-        layout.addWidget(self.web_view)
+        # WebView : créée au premier affichage (démarrage de Chromium coûteux)
+        self.web_view = None
+        self._web_placeholder = QLabel("Chargement de la carte...")
+        self._web_placeholder.setAlignment(Qt.AlignCenter)
+        self._web_placeholder.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        layout.addWidget(self._web_placeholder)
+    
+    def _ensure_web_view(self) -> QWebEngineView:
+        """Instancie la QWebEngineView à la première utilisation"""
+        if self.web_view is None:
+            self.web_view = QWebEngineView()
+            self.web_view.setPage(QWebEnginePage(get_map_profile(), self.web_view))
+            self.web_view.loadFinished.connect(self._on_load_finished)
+            self.web_view.setHtml(self.get_placeholder_html())
+            self.layout().replaceWidget(self._web_placeholder, self.web_view)
+            self._web_placeholder.deleteLater()
+            self._web_placeholder = None
+        return self.web_view
+    
+    def showEvent(self, event):
+        self._ensure_web_view()
+        super().showEvent(event)
+    
+    @Slot(bool)
+    def _on_load_finished(self, ok: bool):
+        self._leaflet_loaded = ok and self._expect_leaflet
+    
+    def _begin_load(self, generated: bool) -> QWebEngineView:
+        self._leaflet_loaded = False
+        self._expect_leaflet = generated
+        return self._ensure_web_view()
     
     def get_placeholder_html(self) -> str:
         return """
@@ -1151,74 +1613,80 @@ class MapPage(QWidget):
     
     @Slot(str)
     def display_map(self, html: str):
-        self.web_view.setHtml(html)
+        self._begin_load(generated=True).setHtml(html)
+    
+    def load_map_file(self, file_path: str, generated: bool = False):
+        """Charge une carte HTML directement depuis le disque (sans copie en Python)"""
+        self._begin_load(generated).load(QUrl.fromLocalFile(os.path.abspath(file_path)))
+        self.current_file = file_path
     
     def open_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Ouvrir un fichier",
             'output' if os.path.exists('output') else '.',
-            "Fichiers carte (*.html);;Fichiers CSV (*.csv)"
+            "Fichiers carte (*.html);;Fichiers CSV (*.csv)",
+            options=_FILE_DIALOG_OPTIONS
         )
         
         if not file_path:
             return
         
         if file_path.endswith('.html'):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                html = f.read()
-            self.web_view.setHtml(html)
-            self.current_file = file_path
+            self.load_map_file(file_path)
         
         elif file_path.endswith('.csv'):
             self.load_from_csv(file_path)
     
     def load_from_csv(self, csv_file: str):
-        """Génère une carte depuis un CSV"""
-        from fusion import load_fused_csv
-        from map_generator import build_map_html
-        
-        class DummyLogger:
-            def log(self, *args, **kwargs): pass
-            def both(self, *args, **kwargs): pass
-            def console(self, *args, **kwargs): pass
-        
-        logger = DummyLogger()
-        data = load_fused_csv(csv_file, logger)
-        
-        if not data:
-            QMessageBox.warning(self, "Erreur", "Aucune donnée dans le CSV.")
-            return
-        
-        valid_coords = [
-            (d["latitude"], d["longitude"]) 
-            for d in data 
-            if d.get("latitude") and d.get("longitude")
-        ]
-        
-        if not valid_coords:
-            QMessageBox.warning(self, "Erreur", "Aucune coordonnée valide.")
-            return
-        
-        center_lat = sum(c[0] for c in valid_coords) / len(valid_coords)
-        center_lon = sum(c[1] for c in valid_coords) / len(valid_coords)
-        
-        features = [d for d in data if d.get("latitude") and d.get("longitude")]
-        
-        html = build_map_html(
-            center_lat=center_lat,
-            center_lon=center_lon,
-            radius_m=500,
-            features=features,
-            title="Carte depuis CSV"
+        """Génère une carte depuis un CSV (lecture par blocs et génération dans un thread)"""
+        map_file = os.path.splitext(csv_file)[0] + '_carte.html'
+        self.status_label.setText("Chargement du CSV...")
+        self.csv_progress.setRange(0, 0)
+        self.csv_progress.show()
+        self.map_worker = CsvMapWorker(
+            csv_file=csv_file,
+            map_file=map_file,
+            title="Carte depuis CSV",
+            parent=self
         )
-        
-        self.web_view.setHtml(html)
-        
-        # Sauvegarder
-        map_file = csv_file.replace('.csv', '_carte.html')
-        with open(map_file, 'w', encoding='utf-8') as f:
-            f.write(html)
-        self.current_file = map_file
+        self.map_worker.progress.connect(self.on_csv_progress)
+        self.map_worker.no_data.connect(self.on_csv_no_data)
+        self.map_worker.map_saved.connect(self.on_map_saved)
+        self.map_worker.error.connect(self.on_map_error)
+        self.map_worker.start()
+    
+    @Slot(int, int)
+    def on_csv_progress(self, processed: int, total: int):
+        if total <= 0:
+            return
+        if self.csv_progress.maximum() != total:
+            self.csv_progress.setRange(0, total)
+        self.csv_progress.setValue(processed)
+        if processed >= total:
+            self.status_label.setText("Generation de la carte...")
+    
+    @Slot(str)
+    def on_csv_no_data(self, message: str):
+        self.status_label.setText("")
+        self.csv_progress.hide()
+        QMessageBox.warning(self, "Erreur", message)
+    
+    @Slot(str, str)
+    def on_map_saved(self, map_file: str, script: str):
+        self.status_label.setText("")
+        self.csv_progress.hide()
+        if self._leaflet_loaded:
+            # Carte Leaflet déjà chargée : on remplace seulement les marqueurs
+            self.web_view.page().runJavaScript(script)
+            self.current_file = map_file
+        else:
+            self.load_map_file(map_file, generated=True)
+    
+    @Slot(str, str)
+    def on_map_error(self, title: str, details: str):
+        self.status_label.setText("")
+        self.csv_progress.hide()
+        QMessageBox.critical(self, title, details)
     
     def open_in_browser(self):
         if self.current_file and os.path.exists(self.current_file):
@@ -1236,6 +1704,7 @@ class NavButton(QPushButton):
     """Bouton de navigation stylisé"""
     def __init__(self, text: str, parent=None):
         super().__init__(text, parent)
+        self.setObjectName("navBtn")
         self.setCheckable(True)
         self.setMinimumHeight(45)
         self.setCursor(Qt.PointingHandCursor)
@@ -1249,6 +1718,11 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Prospection Immobiliere")
         self.setMinimumSize(800, 600)
+        # Services réutilisés par toutes les exécutions (rate limiting BAN commun).
+        # Le scrapper Pages Jaunes n'est pas partagé : un driver Selenium n'est pas
+        # thread-safe, process_streets en crée un par thread.
+        self.address_processor = AddressProcessor()
+        self.entreprise_searcher = EntrepriseSearcher()
         self.setup_menu_bar()
         self.setup_ui()
     
@@ -1358,7 +1832,10 @@ class MainWindow(QMainWindow):
         scroll1 = QScrollArea()
         scroll1.setWidgetResizable(True)
         scroll1.setFrameShape(QFrame.NoFrame)
-        self.complete_page = CompletePage()
+        self.complete_page = CompletePage(
+            address_processor=self.address_processor,
+            entreprise_searcher=self.entreprise_searcher
+        )
         self.complete_page.map_ready.connect(self.on_map_ready)
         scroll1.setWidget(self.complete_page)
         self.stack.addWidget(scroll1)
@@ -1367,7 +1844,10 @@ class MainWindow(QMainWindow):
         scroll2 = QScrollArea()
         scroll2.setWidgetResizable(True)
         scroll2.setFrameShape(QFrame.NoFrame)
-        self.folder_page = FromFolderPage()
+        self.folder_page = FromFolderPage(
+            address_processor=self.address_processor,
+            entreprise_searcher=self.entreprise_searcher
+        )
         self.folder_page.map_ready.connect(self.on_map_ready)
         scroll2.setWidget(self.folder_page)
         self.stack.addWidget(scroll2)
@@ -1386,11 +1866,15 @@ class MainWindow(QMainWindow):
     
     def switch_page(self, index: int):
         """Change de page et met à jour les boutons de navigation"""
-        self.stack.setCurrentIndex(index)
+        if self.stack.currentIndex() != index:
+            self.stack.setCurrentIndex(index)
         
-        # Mettre à jour l'état des boutons
+        # Mettre à jour l'état des boutons (un clic sur le bouton actif le décoche :
+        # la boucle reste nécessaire même si la page ne change pas)
         for i, btn in enumerate(self.nav_buttons):
-            btn.setChecked(i == index)
+            checked = i == index
+            if btn.isChecked() != checked:
+                btn.setChecked(checked)
     
     def apply_styles(self):
         """Applique le style global de l'application"""
@@ -1419,7 +1903,7 @@ class MainWindow(QMainWindow):
             }
             
             /* Boutons de navigation */
-            NavButton {
+            #navBtn {
                 background-color: transparent;
                 color: #cbd5e1;
                 border: none;
@@ -1429,12 +1913,12 @@ class MainWindow(QMainWindow):
                 font-size: 13px;
             }
             
-            NavButton:hover {
+            #navBtn:hover {
                 background-color: #334155;
                 color: white;
             }
             
-            NavButton:checked {
+            #navBtn:checked {
                 background-color: #3b82f6;
                 color: white;
                 font-weight: bold;
@@ -1576,8 +2060,32 @@ class MainWindow(QMainWindow):
                 font-size: 12px;
                 padding: 10px;
             }
+            
+            /* Labels de statut */
+            #statusLabelIdle {
+                color: #64748b;
+                font-size: 13px;
+            }
+            
+            #statusLabelSuccess {
+                color: #22c55e;
+                font-size: 13px;
+                font-weight: bold;
+            }
+            
+            #statusLabelError {
+                color: #ef4444;
+                font-size: 13px;
+                font-weight: bold;
+            }
         """)
     
+    def closeEvent(self, event):
+        """Interrompt les traitements en cours avant de fermer la fenêtre"""
+        self.complete_page.shutdown()
+        self.folder_page.shutdown()
+        super().closeEvent(event)
+    
     @Slot(str)
     def on_map_ready(self, html: str):
         """Affiche la carte et switch sur la page carte"""
@@ -1589,13 +2097,11 @@ class MainWindow(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Ouvrir une carte",
             'output' if os.path.exists('output') else '.',
-            "Fichiers HTML (*.html)"
+            "Fichiers HTML (*.html)",
+            options=_FILE_DIALOG_OPTIONS
         )
         if file_path:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                html = f.read()
-            self.map_page.display_map(html)
-            self.map_page.current_file = file_path
+            self.map_page.load_map_file(file_path)
             self.switch_page(2)
     
     def open_csv_file(self):
@@ -1603,7 +2109,8 @@ class MainWindow(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Ouvrir un CSV",
             'output' if os.path.exists('output') else '.',
-            "Fichiers CSV (*.csv)"
+            "Fichiers CSV (*.csv)",
+            options=_FILE_DIALOG_OPTIONS
         )
         if file_path:
             self.map_page.load_from_csv(file_path)
@@ -1619,7 +2126,10 @@ def main():
     window = MainWindow()
     window.show()
     
-    sys.exit(app.exec())
+    code = app.exec()
+    # Fenêtre fermée : les traitements annulés encore en cours terminent leur requête
+    wait_detached_threads()
+    sys.exit(code)
 
 
 if __name__ == "__main__":
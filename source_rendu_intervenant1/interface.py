@@ -1,10 +1,23 @@
 import os
+import atexit
+from collections import deque
 from datetime import datetime
 
+# Préfixe affiché en console selon le niveau
+_PREFIX = {"SUCCESS": "✅ ", "ERROR": "❌ ", "PROGRESS": "⏳ "}
+
+# Nombre de lignes conservées dans le fichier de log
+MAX_LOG_LINES = 100
+
 class Logger:
     def __init__(self, log_path):
         self.log_file = log_path
         self.ensure_log_file_exists()
+        # Les dernières lignes du log sont gardées en mémoire et écrites en une fois
+        # à la sortie du programme (plus de relecture/réécriture du fichier à chaque message)
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            self._buffer = deque(f, maxlen=MAX_LOG_LINES)
+        atexit.register(self.flush)
     
     def ensure_log_file_exists(self):
         """Crée le fichier de log s'il n'existe pas"""
@@ -15,35 +28,18 @@ class Logger:
     def log(self, message, level="INFO"):
         """Écrit uniquement dans le fichier de log"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_message = f"[{timestamp}] [{level}] {message}\n"
-        
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_message)
-        self.clear_log() 
+        self._buffer.append(f"[{timestamp}] [{level}] {message}\n")
 
     def console(self, message, level="INFO"):
         """Affiche uniquement dans la console"""
-        if level == "SUCCESS":
-            print(f"✅ {message}")
-        elif level == "ERROR":
-            print(f"❌ {message}")
-        elif level == "PROGRESS":
-            print(f"⏳ {message}")
-        else:
-            print(message)
-        self.clear_log() 
+        print(f"{_PREFIX.get(level, '')}{message}")
         
     def both(self, message, level="INFO"):
         """Affiche dans la console ET écrit dans le log"""
         self.console(message)
         self.log(message, level)
-        self.clear_log() 
 
-    def clear_log(self):
-        """Conserve uniquement les 100 dernières lignes du log"""
-        with open(self.log_file, 'r+', encoding='utf-8') as f:
-            lines = f.readlines()
-            # Conserve les 100 dernières lignes
-            f.seek(0)
-            f.writelines(lines[-100:])
-            f.truncate()
+    def flush(self):
+        """Écrit les 100 dernières lignes dans le fichier de log"""
+        with open(self.log_file, 'w', encoding='utf-8') as f:
+            f.writelines(self._buffer)
@@ -0,0 +1,76 @@
+# disk_cache.py
+# -*- coding: utf-8 -*-
+"""
+Cache SQLite persistant entre les exécutions (géocodage BAN, requêtes Overpass).
+Les valeurs sont stockées en JSON, indexées par SHA1 de la clé.
+Si le fichier de cache ne peut pas être ouvert, le cache est simplement désactivé.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Optional
+
+
+CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "prospection", "open_data.sqlite"
+)
+
+DEFAULT_TTL = 30 * 24 * 3600  # 30 jours
+
+# Connexion partagée entre les threads du pool d'enrichissement
+LOCK = threading.Lock()
+
+
+def _open(path: str) -> Optional[sqlite3.Connection]:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value TEXT, ts INTEGER)"
+        )
+        conn.commit()
+        return conn
+    except (OSError, sqlite3.Error):
+        return None
+
+
+_CONN = _open(CACHE_PATH)
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """Clé stable: SHA1 de l'espace de noms et des parties sérialisées en JSON"""
+    payload = json.dumps([namespace, *parts], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str, ttl: Optional[int] = DEFAULT_TTL) -> Optional[Any]:
+    """Retourne la valeur en cache, ou None si absente / expirée"""
+    if _CONN is None:
+        return None
+    with LOCK:
+        row = _CONN.execute(
+            "SELECT value, ts FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+    if row is None:
+        return None
+    value, ts = row
+    if ttl is not None and ts + ttl < time.time():
+        return None
+    return json.loads(value)
+
+
+def set(key: str, value: Any):
+    """Enregistre une valeur sérialisable en JSON"""
+    if _CONN is None:
+        return
+    with LOCK:
+        _CONN.execute(
+            "INSERT OR REPLACE INTO cache (key, value, ts) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), int(time.time()))
+        )
+        _CONN.commit()
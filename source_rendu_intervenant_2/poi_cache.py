@@ -0,0 +1,153 @@
+# poi_cache.py
+# -*- coding: utf-8 -*-
+"""
+Index spatial local des POI Overpass (module R*Tree de SQLite).
+Chaque zone déjà interrogée est mémorisée: toute recherche dont la boîte englobante
+est incluse dans une zone fraîche est servie localement, sans appel Overpass.
+L'index R*Tree stocke des boîtes float32 arrondies vers l'extérieur: il ne sert qu'au
+préfiltrage (recouvrement), le test exact se fait sur les coordonnées stockées en REAL.
+Si SQLite n'a pas le module R*Tree ou si le fichier ne peut pas être ouvert,
+le cache est simplement désactivé.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+
+CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "prospection", "pois.sqlite"
+)
+
+# Boîte englobante: (min_lat, min_lon, max_lat, max_lon)
+BBox = Tuple[float, float, float, float]
+
+# POI: (osm_id, lat, lon, name, category, address)
+Poi = Tuple[int, float, float, str, str, str]
+
+LOCK = threading.Lock()
+
+
+def _open(path: str) -> Optional[sqlite3.Connection]:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.executescript(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS poi_idx "
+            "USING rtree(id, min_lat, max_lat, min_lon, max_lon);"
+            "CREATE TABLE IF NOT EXISTS poi "
+            "(id INTEGER PRIMARY KEY, lat REAL, lon REAL, name TEXT, category TEXT, address TEXT);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS area_idx "
+            "USING rtree(id, min_lat, max_lat, min_lon, max_lon);"
+            "CREATE TABLE IF NOT EXISTS area "
+            "(id INTEGER PRIMARY KEY, ts INTEGER, "
+            "min_lat REAL, max_lat REAL, min_lon REAL, max_lon REAL);"
+        )
+        # Ancien schéma (zones sans bornes exactes): zones oubliées, les POI sont conservés
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(area)")}
+        if "min_lat" not in columns:
+            conn.executescript(
+                "DROP TABLE area;"
+                "DELETE FROM area_idx;"
+                "CREATE TABLE area "
+                "(id INTEGER PRIMARY KEY, ts INTEGER, "
+                "min_lat REAL, max_lat REAL, min_lon REAL, max_lon REAL);"
+            )
+        conn.commit()
+        return conn
+    except (OSError, sqlite3.Error):
+        return None
+
+
+_CONN = _open(CACHE_PATH)
+
+
+def covers(bbox: BBox, ttl: int) -> bool:
+    """Vrai si une zone interrogée il y a moins de `ttl` secondes contient bbox"""
+    if _CONN is None:
+        return False
+    min_lat, min_lon, max_lat, max_lon = bbox
+    with LOCK:
+        row = _CONN.execute(
+            "SELECT 1 FROM area_idx i JOIN area a USING (id) "
+            "WHERE i.min_lat <= ? AND i.max_lat >= ? AND i.min_lon <= ? AND i.max_lon >= ? "
+            "AND a.min_lat <= ? AND a.max_lat >= ? AND a.min_lon <= ? AND a.max_lon >= ? "
+            "AND a.ts >= ? LIMIT 1",
+            (min_lat, max_lat, min_lon, max_lon) * 2 + (int(time.time()) - ttl,)
+        ).fetchone()
+    return row is not None
+
+
+# Recouvrement sur l'index (boîtes arrondies vers l'extérieur), puis test exact sur poi.lat / poi.lon
+_POI_IN_BBOX = (
+    "WHERE poi_idx.max_lat >= ? AND poi_idx.min_lat <= ? "
+    "AND poi_idx.max_lon >= ? AND poi_idx.min_lon <= ? "
+    "AND poi.lat BETWEEN ? AND ? AND poi.lon BETWEEN ? AND ?"
+)
+
+
+def _poi_in_bbox_params(bbox: BBox) -> Tuple[float, ...]:
+    min_lat, min_lon, max_lat, max_lon = bbox
+    return (min_lat, max_lat, min_lon, max_lon, min_lat, max_lat, min_lon, max_lon)
+
+
+def query(bbox: BBox) -> List[Poi]:
+    """POI dont la position est dans bbox (recherche par l'index R*Tree)"""
+    if _CONN is None:
+        return []
+    with LOCK:
+        return _CONN.execute(
+            "SELECT id, lat, lon, name, category, address "
+            "FROM poi_idx JOIN poi USING (id) " + _POI_IN_BBOX,
+            _poi_in_bbox_params(bbox)
+        ).fetchall()
+
+
+def store(bbox: BBox, pois: List[Poi]):
+    """Remplace les POI de bbox par ceux fournis et marque la zone comme interrogée"""
+    if _CONN is None:
+        return
+    min_lat, min_lon, max_lat, max_lon = bbox
+    with LOCK:
+        with _CONN:
+            # POI disparus d'OSM depuis la dernière interrogation de la zone
+            stale = _CONN.execute(
+                "SELECT id FROM poi_idx JOIN poi USING (id) " + _POI_IN_BBOX,
+                _poi_in_bbox_params(bbox)
+            ).fetchall()
+            _CONN.executemany("DELETE FROM poi_idx WHERE id = ?", stale)
+            _CONN.executemany("DELETE FROM poi WHERE id = ?", stale)
+
+            _CONN.executemany(
+                "INSERT OR REPLACE INTO poi (id, lat, lon, name, category, address) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                pois
+            )
+            _CONN.executemany(
+                "INSERT OR REPLACE INTO poi_idx (id, min_lat, max_lat, min_lon, max_lon) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(p[0], p[1], p[1], p[2], p[2]) for p in pois]
+            )
+
+            # Zones incluses dans la nouvelle: remplacées par elle (la table ne grossit pas
+            # à chaque rafraîchissement d'une même zone)
+            covered = _CONN.execute(
+                "SELECT id FROM area_idx i JOIN area a USING (id) "
+                "WHERE i.max_lat >= ? AND i.min_lat <= ? AND i.max_lon >= ? AND i.min_lon <= ? "
+                "AND a.min_lat >= ? AND a.max_lat <= ? AND a.min_lon >= ? AND a.max_lon <= ?",
+                (min_lat, max_lat, min_lon, max_lon) * 2
+            ).fetchall()
+            _CONN.executemany("DELETE FROM area_idx WHERE id = ?", covered)
+            _CONN.executemany("DELETE FROM area WHERE id = ?", covered)
+
+            cur = _CONN.execute(
+                "INSERT INTO area_idx (min_lat, max_lat, min_lon, max_lon) VALUES (?, ?, ?, ?)",
+                (min_lat, max_lat, min_lon, max_lon)
+            )
+            _CONN.execute(
+                "INSERT INTO area (id, ts, min_lat, max_lat, min_lon, max_lon) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cur.lastrowid, int(time.time()), min_lat, max_lat, min_lon, max_lon)
+            )
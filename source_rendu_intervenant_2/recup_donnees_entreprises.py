@@ -12,12 +12,29 @@ Aucune clé API nécessaire.
 """
 
 import sys
+import io
+import re
+import csv
 import json
 import time
 import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# unidecode (optionnel) : suppression des accents pour comparer les noms
+try:
+    from unidecode import unidecode
+except ImportError:
+    unidecode = None
+
+# cache SQLite persistant entre les exécutions
+import disk_cache
 
 # import du calcul des surfaces
 from oms_surface.surface_year import get_surfaces_and_year
@@ -29,9 +46,61 @@ from overpass_client import overpass as overpass_query
 # Constantes
 UA = {"User-Agent": "prospection-open-data/1.2 "}
 BAN_URL = "https://api-adresse.data.gouv.fr/search/"
+BAN_CSV_URL = "https://api-adresse.data.gouv.fr/search/csv/"
+BAN_CSV_CHUNK = 5000  # lignes par requête batch
+
+# Session HTTP partagée par les threads d'enrichissement: connexions keep-alive
+# réutilisées (pas de nouvelle poignée de main TCP/TLS par appel BAN / API Entreprises)
+SESSION = requests.Session()
+SESSION.headers.update(UA)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 RE_URL = "https://recherche-entreprises.api.gouv.fr/search"
 
+# Pool dédié aux appels API Entreprises lancés en parallèle des requêtes Overpass de run_test
+# (tâches feuilles: elles ne soumettent rien elles-mêmes, donc pas d'interblocage)
+RE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api-entreprises")
+
 # -------------- Utils --------------
+class _TokenBucket:
+    """
+    Limiteur de débit partagé par les threads: au plus `rate` requêtes/s,
+    avec des rafales jusqu'à `burst` requêtes.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Quotas publics par hôte (BAN: 50 req/s/IP, Recherche d'entreprises: 7 req/s/IP),
+# pris avec une marge. Overpass est déjà sérialisé par overpass_client.
+HOST_LIMITS: Dict[str, _TokenBucket] = {
+    "api-adresse.data.gouv.fr": _TokenBucket(rate=20, burst=20),
+    "recherche-entreprises.api.gouv.fr": _TokenBucket(rate=6, burst=6),
+}
+
+
+def _throttle(url: str):
+    bucket = HOST_LIMITS.get(urlsplit(url).hostname or "")
+    if bucket is not None:
+        bucket.acquire()
+
 def _retry_get(
     url: str,
     *,
@@ -44,7 +113,8 @@ def _retry_get(
     last_exc: Optional[Exception] = None
     for i in range(tries):
         try:
-            r = requests.get(url, params=params, headers=headers, timeout=timeout)
+            _throttle(url)
+            r = SESSION.get(url, params=params, headers=headers, timeout=timeout)
             return r
         except requests.RequestException as e:
             last_exc = e
@@ -56,7 +126,26 @@ def _retry_get(
     raise RuntimeError("Échec inconnu dans _retry_get")
 
 # -------------- BAN: géocodage --------------
+def _normalize_address(address: str) -> str:
+    """Clé de cache: adresse en minuscules, espaces multiples réduits"""
+    return re.sub(r"\s+", " ", address.strip().lower())
+
 def geocode_ban(address: str) -> Optional[Dict[str, Any]]:
+    return _geocode_ban_cached(_normalize_address(address))
+
+@lru_cache(maxsize=4096)
+def _geocode_ban_cached(norm: str) -> Optional[Dict[str, Any]]:
+    """Géocodage BAN mémoïsé en mémoire (lru_cache) puis sur disque (SQLite)"""
+    key = disk_cache.make_key("ban", norm)
+    cached = disk_cache.get(key)
+    if cached is not None:
+        return cached
+    geo = _geocode_ban_http(norm)
+    if geo:
+        disk_cache.set(key, geo)
+    return geo
+
+def _geocode_ban_http(address: str) -> Optional[Dict[str, Any]]:
     params = {"q": address, "limit": 1}
     r = _retry_get(BAN_URL, params=params, headers=UA, timeout=20, tries=3)
     r.raise_for_status()
@@ -79,6 +168,78 @@ def geocode_ban(address: str) -> Optional[Dict[str, Any]]:
         "score": props.get("score"),
     }
 
+def _ban_csv_row_to_geo(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Convertit une ligne de réponse /search/csv/ au format de geocode_ban()"""
+    if row.get("result_status", "ok") != "ok":
+        return None
+    lat = row.get("latitude") or row.get("result_latitude")
+    lon = row.get("longitude") or row.get("result_longitude")
+    if not lat or not lon:
+        return None
+    score = row.get("result_score")
+    return {
+        "lat": float(lat),
+        "lon": float(lon),
+        "label": row.get("result_label") or None,
+        "housenumber": row.get("result_housenumber") or None,
+        "street": row.get("result_street") or None,
+        "postcode": row.get("result_postcode") or None,
+        "city": row.get("result_city") or None,
+        "citycode": row.get("result_citycode") or None,
+        "context": row.get("result_context") or None,
+        "score": float(score) if score else None,
+    }
+
+def geocode_ban_batch(addresses: List[str], timeout: int = 60) -> List[Optional[Dict[str, Any]]]:
+    """
+    Géocode une liste d'adresses en une (ou quelques) requête(s) via l'endpoint CSV de la BAN.
+    Retourne une liste alignée sur l'entrée (None si adresse introuvable).
+    Seules les adresses absentes du cache disque sont envoyées à la BAN, une fois chacune.
+    """
+    keys = [disk_cache.make_key("ban", _normalize_address(a)) for a in addresses]
+    out: List[Optional[Dict[str, Any]]] = [None] * len(addresses)
+    # Clé -> indices des adresses identiques (après normalisation) à géocoder
+    pending: Dict[str, List[int]] = {}
+    for i, key in enumerate(keys):
+        if key in pending:
+            pending[key].append(i)
+            continue
+        out[i] = disk_cache.get(key)
+        if out[i] is None:
+            pending[key] = [i]
+    missing = list(pending.values())
+
+    for start in range(0, len(missing), BAN_CSV_CHUNK):
+        groups = missing[start:start + BAN_CSV_CHUNK]
+        chunk = [addresses[group[0]] for group in groups]
+
+        # csv.writer pour échapper correctement les virgules des adresses
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["address"])
+        writer.writerows([a] for a in chunk)
+
+        _throttle(BAN_CSV_URL)
+        r = SESSION.post(
+            BAN_CSV_URL,
+            files={"data": ("addresses.csv", buf.getvalue().encode("utf-8"), "text/csv")},
+            data={"columns": "address"},
+            headers=UA,
+            timeout=timeout,
+        )
+        r.raise_for_status()
+
+        rows = list(csv.DictReader(io.StringIO(r.content.decode("utf-8-sig"))))
+        if len(rows) != len(chunk):
+            raise ValueError(f"BAN CSV: {len(rows)} ligne(s) reçue(s) pour {len(chunk)} adresse(s)")
+        for group, row in zip(groups, rows):
+            geo = _ban_csv_row_to_geo(row)
+            if geo:
+                disk_cache.set(keys[group[0]], geo)
+            for i in group:
+                out[i] = geo
+    return out
+
 def _call_re(params_local: Dict[str, Any]) -> Dict[str, Any]:
     """
     Appel robuste de l'API Recherche d'entreprises (/search).
@@ -191,8 +352,9 @@ def search_company_re(
         params["code_commune"] = commune_insee
 
     # Ajouter dirigeants si demandé
+    # matching_etablissements: établissement correspondant aux filtres (son SIRET, pas celui du siège)
     if include_dirigeants:
-        params["include"] = "dirigeants"
+        params["include"] = "dirigeants,matching_etablissements"
         params["minimal"] = "true"  # requis quand include=* est présent
 
     data = _call_re(params)
@@ -208,6 +370,8 @@ def search_company_re(
         siege = it.get("siege") or {}
         adresse = siege.get("adresse") or {}
         naf = it.get("activite_principale") or {}
+        matching = it.get("matching_etablissements") or []
+        etab = matching[0] if isinstance(matching, list) and matching and isinstance(matching[0], dict) else {}
 
         # Dirigeants (si présents)
         dir_list_raw = it.get("dirigeants") or []
@@ -228,6 +392,7 @@ def search_company_re(
                 "tranche_effectif_salarie": it.get("tranche_effectif_salarie"),
                 "naf": naf.get("code") if isinstance(naf, dict) else naf,
                 "naf_libelle": naf.get("libelle") if isinstance(naf, dict) else None,
+                "siret": etab.get("siret"),  # établissement trouvé (distinct par succursale)
                 "siret_siege": siege.get("siret"),
                 "adresse_siege": {
                     "label": adresse.get("label") or " ".join(
@@ -265,18 +430,13 @@ def get_osm_contacts(lat: float, lon: float, company_name: str, radius: int = 20
         "match_count": 0|1
       }
     """
-    import re
-
     # --- Helpers locaux (scopés à la fonction pour ne pas modifier le reste du fichier) ---
 
     def _norm(s: str) -> str:
         if not s:
             return ""
-        try:
-            from unidecode import unidecode
+        if unidecode is not None:
             s = unidecode(s)
-        except Exception:
-            pass
         s = s.lower().replace("’", "'")
         s = re.sub(r"[^a-z0-9@:/._-]+", " ", s)
         s = re.sub(r"\s+", " ", s).strip()
@@ -472,15 +632,18 @@ def _pick_owner_from_dirigeants(dirigeants: List[Dict[str, Optional[str]]]) -> O
     return best
 
 # -------------- Test unique (main) --------------
-def run_test(company_name: str, address: str) -> Dict[str, Any]:
-    # 1) Géocodage
-    geo = geocode_ban(address)
+def run_test(company_name: str, address: str, geo: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # 1) Géocodage (sauf si déjà résolu, ex: par geocode_ban_batch)
+    if geo is None:
+        geo = geocode_ban(address)
     if not geo:
         raise SystemExit("Géocodage impossible: adresse introuvable dans la BAN.")
     lat, lon = geo["lat"], geo["lon"]
 
-    # 2) Entreprises candidates (avec dirigeants)
-    companies = search_company_re(
+    # 2) Entreprises candidates (avec dirigeants), en arrière-plan: l'API Entreprises
+    # est indépendante d'Overpass, sa latence se recouvre avec les étapes 4) et 5)
+    companies_future = RE_POOL.submit(
+        search_company_re,
         company_name,
         commune_insee=geo.get("citycode"),
         code_postal=geo.get("postcode"),
@@ -488,6 +651,14 @@ def run_test(company_name: str, address: str) -> Dict[str, Any]:
         include_dirigeants=True,
     )
 
+    # 4) Contacts OSM
+    contacts = get_osm_contacts(lat, lon, company_name, radius=200)
+
+    # 5) Surfaces + année
+    surf = get_surfaces_and_year(lat, lon, radius=250)
+
+    companies = companies_future.result()
+
     # 3) Déduire un "owner" probable à partir de la meilleure entreprise (si trouvée)
     owner: Optional[Dict[str, Optional[str]]] = None
     if companies:
@@ -495,12 +666,6 @@ def run_test(company_name: str, address: str) -> Dict[str, Any]:
         # puis choisir un "owner" dans ses dirigeants personnes physiques
         owner = _pick_owner_from_dirigeants(companies[0].get("dirigeants") or [])
 
-    # 4) Contacts OSM
-    contacts = get_osm_contacts(lat, lon, company_name, radius=200)
-
-    # 5) Surfaces + année
-    surf = get_surfaces_and_year(lat, lon, radius=250)
-
     return {
         "query": {"company_name": company_name, "address": address},
         "geocoding": geo,
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("requests")
+pytest.importorskip("shapely")
+pytest.importorskip("pyproj")
+
+import ui_prospection as ui
+
+
+ADDRESS = "1 Rue de Rivoli, 75001 Paris"
+
+# Deux noms OSM pour le même établissement, et une autre succursale de la même entreprise
+SIRETS = {
+    "Boulangerie Martin": "12345678900011",
+    "Martin Pains": "12345678900011",
+    "Boulangerie Martin Louvre": "12345678900029",
+}
+
+
+def _added_markers(scripts):
+    """Propriétés de tous les marqueurs envoyés par addMarkers(...)"""
+    props = []
+    for script in scripts:
+        if script.startswith("addMarkers("):
+            props += json.loads(script[len("addMarkers("):-len(");")])["props"]
+    return props
+
+
+def test_same_siret_single_marker(monkeypatch):
+    monkeypatch.setattr(ui.te, "geocode_address", lambda address: (48.86, 2.34))
+    monkeypatch.setattr(
+        ui, "_find_businesses",
+        lambda lat, lon, radius_m: [(name, "bakery", 50, ADDRESS) for name in SIRETS]
+    )
+    monkeypatch.setattr(ui.rde, "geocode_ban_batch", lambda addresses: [None] * len(addresses))
+
+    worker = ui.ProspectWorker(ADDRESS, 1.0)
+    monkeypatch.setattr(
+        worker, "_enrich_one",
+        lambda item, geo: ui.Marker(48.86, 2.34, {"name": item.name, "company": {"siret": SIRETS[item.name]}})
+    )
+    scripts = []
+    worker.markers_ready.connect(scripts.append)
+    worker.run()
+
+    sirets = [p["company"]["siret"] for p in _added_markers(scripts)]
+    assert sorted(sirets) == ["12345678900011", "12345678900029"]
+
+
+def test_siret_of_matching_establishment(monkeypatch):
+    monkeypatch.setattr(ui.rde, "_call_re", lambda params: {"results": [{
+        "siren": "123456789",
+        "siege": {"siret": "12345678900011"},
+        "matching_etablissements": [{"siret": "12345678900029"}],
+    }]})
+    companies = ui.rde.search_company_re("Boulangerie Martin Louvre", code_postal="75001")
+    summary = ui.extract_company_summary({"companies": companies})
+    # SIRET de l'établissement trouvé, pas celui du siège
+    assert summary["siret"] == "12345678900029"
@@ -1,21 +1,47 @@
 # trouve_entreprise.py
 # -*- coding: utf-8 -*-
 
+import math
+from functools import lru_cache
+
 import requests
-from geopy.distance import geodesic
+
+# numpy (optionnel) : distances de tous les nodes en un seul passage, repli sur math sinon
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 from overpass_client import overpass
+import disk_cache
+import poi_cache
 
 
 BAN_URL = "https://api-adresse.data.gouv.fr/search/"
 
+EARTH_RADIUS_M = 6371000
+
+# Les commerces changent moins vite que le cache BAN n'expire (zones de l'index POI)
+BUSINESSES_TTL = 7 * 24 * 3600
+
 
+@lru_cache(maxsize=256)
 def geocode_address(address: str):
     """
-    Géocodage via BAN.
+    Géocodage via BAN (mémoïsé en mémoire et sur disque).
     Retourne (lat, lon)
     """
 
+    key = disk_cache.make_key(
+        "ban_center",
+        " ".join(address.lower().split())
+    )
+
+    cached = disk_cache.get(key)
+
+    if cached is not None:
+        return tuple(cached)
+
     params = {
         "q": address,
         "limit": 1
@@ -40,9 +66,38 @@ def geocode_address(address: str):
 
     lon, lat = features[0]["geometry"]["coordinates"]
 
+    disk_cache.set(key, [lat, lon])
+
     return lat, lon
 
 
+def distances_m(lat, lon, lats, lons):
+    """
+    Distances en mètres entre le centre (lat, lon) et une liste de points
+    (approximation équirectangulaire, erreur ~0,1 % sous 10 km).
+    """
+
+    # Constantes dépendant du centre calculées une seule fois
+    m_per_deg_lat = EARTH_RADIUS_M * math.pi / 180
+    m_per_deg_lon = m_per_deg_lat * math.cos(
+        math.radians(lat)
+    )
+
+    if np is None:
+        return [
+            math.hypot(
+                (p_lon - lon) * m_per_deg_lon,
+                (p_lat - lat) * m_per_deg_lat
+            )
+            for p_lat, p_lon in zip(lats, lons)
+        ]
+
+    return np.hypot(
+        (np.asarray(lons, dtype=np.float64) - lon) * m_per_deg_lon,
+        (np.asarray(lats, dtype=np.float64) - lat) * m_per_deg_lat
+    ).tolist()
+
+
 def get_address_from_tags(tags):
 
     parts = []
@@ -75,23 +130,69 @@ def find_businesses(
         verbose=False
 ):
 
+    # Boîte englobante du cercle: filtre indexé, moins coûteux pour Overpass
+    # qu'un "around"; le cercle exact est appliqué ensuite sur la distance.
+    m_per_deg_lat = EARTH_RADIUS_M * math.pi / 180
+    lat_delta = radius / m_per_deg_lat
+    lon_delta = radius / (m_per_deg_lat * math.cos(math.radians(lat)))
+    bbox = (lat - lat_delta, lon - lon_delta, lat + lat_delta, lon + lon_delta)
+
+    # Index spatial local: toute zone incluse dans une zone déjà interrogée
+    # (même centre décalé, rayon plus petit) est servie sans appel Overpass
+    if poi_cache.covers(bbox, BUSINESSES_TTL):
+
+        pois = poi_cache.query(bbox)
+
+    else:
+
+        pois = _fetch_pois(bbox, verbose)
+
+        poi_cache.store(bbox, pois)
+
+    dists = distances_m(
+        lat,
+        lon,
+        [poi[1] for poi in pois],
+        [poi[2] for poi in pois]
+    )
+
+    businesses = [
+        (
+            name,
+            category,
+            round(dist_m),
+            address
+        )
+        for (_, _, _, name, category, address), dist_m in zip(pois, dists)
+        # Coins de la boîte hors du cercle (~21 % de sa surface)
+        if dist_m <= radius
+    ]
+
+    businesses.sort(
+        key=lambda x: x[2]
+    )
+
+    return businesses
+
+
+def _fetch_pois(bbox, verbose=False):
+    """
+    Interroge Overpass sur une boîte englobante.
+    Retourne des POI (osm_id, lat, lon, name, category, address)
+    """
+
+    bbox_str = ",".join(str(c) for c in bbox)
+
+    # Seuls les nodes sont exploités ci-dessous: inutile de demander ways/relations.
+    # Un seul "out body;" (deux sorties renvoyaient chaque élément deux fois).
     query = f"""
 [out:json][timeout:60];
 (
- node(around:R,lat,lon)["office"];
- node(around:R,lat,lon)["shop"];
- node(around:R,lat,lon)["craft"];
- node(around:R,lat,lon)["amenity"];
- way(around:R,lat,lon)["office"];
- way(around:R,lat,lon)["shop"];
- way(around:R,lat,lon)["craft"];
- way(around:R,lat,lon)["amenity"];
- relation(around:R,lat,lon)["office"];
- relation(around:R,lat,lon)["shop"];
- relation(around:R,lat,lon)["craft"];
- relation(around:R,lat,lon)["amenity"];
+ node({bbox_str})["office"];
+ node({bbox_str})["shop"];
+ node({bbox_str})["craft"];
+ node({bbox_str})["amenity"];
 );
-out center tags;
 out body;
 """
 
@@ -100,9 +201,7 @@ out body;
         verbose=verbose
     )
 
-    origin = (lat, lon)
-
-    businesses = []
+    pois = []
 
     for node in data.get("elements", []):
 
@@ -122,32 +221,22 @@ out body;
             or "n/a"
         )
 
-        dist_m = geodesic(
-            origin,
-            (
-                node["lat"],
-                node["lon"]
-            )
-        ).meters
-
         address = get_address_from_tags(
             tags
         )
 
-        businesses.append(
+        pois.append(
             (
+                node["id"],
+                node["lat"],
+                node["lon"],
                 name,
                 category,
-                round(dist_m),
                 address
             )
         )
 
-    businesses.sort(
-        key=lambda x: x[2]
-    )
-
-    return businesses
+    return pois
 
 
 if __name__ == "__main__":
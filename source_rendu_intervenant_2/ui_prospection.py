@@ -1,22 +1,35 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import sys
 import json
 import html
+import base64
+import hashlib
+import inspect
+import tempfile
+import time
+import threading
 import traceback
-from typing import Any, Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from math import ceil
 
 # UI (Qt)
-from PySide6.QtCore import Qt, QThread, Signal, QObject, Slot
+from PySide6.QtCore import Qt, QThread, Signal, QObject, Slot, QUrl
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QDoubleSpinBox, QPushButton, QProgressBar, QMessageBox
 )
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
+# orjson (optionnel) : sérialisation des marqueurs plus rapide, repli sur json sinon
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import des 2 programmes (même dossier)
 try:
     import trouve_entreprise as te  # programme 1
@@ -31,6 +44,25 @@ except Exception as e:
     sys.exit(1)
 
 
+# Compat: certains codes de find_businesses n'acceptent pas radius en mot-clé.
+# La signature est résolue une fois à l'import plutôt qu'à chaque exécution.
+if "radius" in inspect.signature(te.find_businesses).parameters:
+    def _find_businesses(lat: float, lon: float, radius_m: int):
+        return te.find_businesses(lat, lon, radius=radius_m)
+else:
+    def _find_businesses(lat: float, lon: float, radius_m: int):
+        return te.find_businesses(lat, lon, radius_m)
+
+
+# Intervalle minimal entre deux mises à jour de la barre de progression (10 Hz):
+# chaque emit traverse les threads et déclenche un repaint
+PROGRESS_INTERVAL_S = 0.1
+
+
+# Carte vide écrite sur disque puis chargée par URL; les marqueurs y sont poussés par runJavaScript
+MAP_FILE = os.path.join(tempfile.gettempdir(), f"prospection_carte_{os.getpid()}.html")
+
+
 # ----------------- Utils -----------------
 def sanitize(s, default=""):
     try:
@@ -49,34 +81,28 @@ def listify(x):
     return [x]
 
 
-def has_contact(data: Dict[str, Any]) -> bool:
+def analyze(data: Dict[str, Any]) -> Optional[Tuple[Dict[str, List[str]], Dict[str, Any]]]:
     """
-    Critère: au moins 1 email OU 1 téléphone.
-    On cherche d'abord dans contacts_osm (programme 2). Si vide, on tente les champs fréquents.
+    Filtre et extraction en un seul passage sur le résultat du programme 2.
+    Critère: au moins 1 email OU 1 téléphone dans contacts_osm (avec les champs de repli fréquents).
+    Retourne (contacts nettoyés, résumé entreprise), ou None si aucun contact.
     """
     contacts = data.get("contacts_osm") or {}
-    phones = listify(contacts.get("phones"))
-    emails = listify(contacts.get("emails"))
-    # Fallback éventuels
-    if not phones:
-        phones = listify(contacts.get("phone") or contacts.get("tels") or [])
-    if not emails:
-        emails = listify(contacts.get("email") or contacts.get("mails") or [])
-    return (len(phones) > 0) or (len(emails) > 0)
-
-
-def extract_contacts(data: Dict[str, Any]) -> Dict[str, List[str]]:
-    contacts = data.get("contacts_osm") or {}
-    phones = [sanitize(x) for x in listify(contacts.get("phones") or contacts.get("phone") or []) if x]
-    emails = [sanitize(x) for x in listify(contacts.get("emails") or contacts.get("email") or []) if x]
+    phones = [sanitize(x) for x in listify(contacts.get("phones") or contacts.get("phone") or contacts.get("tels")) if x]
+    emails = [sanitize(x) for x in listify(contacts.get("emails") or contacts.get("email") or contacts.get("mails")) if x]
+    if not (phones or emails):
+        return None
     websites = [sanitize(x) for x in listify(contacts.get("websites") or contacts.get("website") or []) if x]
     socials = [sanitize(x) for x in listify(contacts.get("socials") or []) if x]
-    return {
-        "phones": phones,
-        "emails": emails,
-        "websites": websites,
-        "socials": socials,
-    }
+    return (
+        {
+            "phones": phones,
+            "emails": emails,
+            "websites": websites,
+            "socials": socials,
+        },
+        extract_company_summary(data),
+    )
 
 
 def extract_company_summary(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -104,237 +130,133 @@ def extract_company_summary(data: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
-def safe_float(x, default=None):
+def dumps_json(obj: Any) -> str:
+    """JSON compact (orjson si disponible); types inconnus convertis en texte"""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# Champs du dirigeant (programme 2) et du bâtiment repris dans les propriétés des marqueurs
+OWNER_FIELDS = ("first_name", "last_name", "role")
+BUILDING_FIELDS = ("building_year", "roof_area_m2", "parking_area_m2")
+
+
+class Prospect(NamedTuple):
+    """Entreprise trouvée par le programme 1, à enrichir"""
+    name: str
+    category: str
+    distance_m: float
+    address: str
+    center_lat: float
+    center_lon: float
+
+
+class Marker(NamedTuple):
+    """Prospect enrichi et retenu: position + propriétés affichées dans la popup"""
+    lat: float
+    lon: float
+    props: Dict[str, Any]
+
+
+# Leaflet + MarkerCluster: copie locale (cache utilisateur) téléchargée une fois depuis unpkg,
+# la carte n'attend plus le CDN à l'affichage. Tant qu'elle est incomplète, le CDN est utilisé.
+LEAFLET_CDN = "https://unpkg.com/"
+LEAFLET_DIR = os.path.join(os.path.expanduser("~"), ".cache", "prospection", "leaflet")
+
+# Chemin local -> (chemin sur unpkg, empreinte SRI ou None)
+LEAFLET_ASSETS: Dict[str, Tuple[str, Optional[str]]] = {
+    "leaflet.css": ("leaflet@1.9.4/dist/leaflet.css", "sha256-p4NxAoJBhIIN+hmNHrzRCf9tD/miZyoHS5obTRR9BMY="),
+    "leaflet.js": ("leaflet@1.9.4/dist/leaflet.js", "sha256-20nQCchB9co0qIjJZRGuk2/Z9VM+kNiyxNV1lvTlZBo="),
+    "MarkerCluster.css": ("leaflet.markercluster@1.5.3/dist/MarkerCluster.css", "sha256-YU3qCpj/P06tdPBJGPax0bm6Q1wltfwjsho5TR4+TYc="),
+    "MarkerCluster.Default.css": ("leaflet.markercluster@1.5.3/dist/MarkerCluster.Default.css", "sha256-YSWCMtmNZNwqex4CEw1nQhvFub2lmU7vcCKP+XVwwXA="),
+    "leaflet.markercluster.js": ("leaflet.markercluster@1.5.3/dist/leaflet.markercluster.js", "sha256-Hk4dIpcqOSb0hZjgyvFOP+cEmDXUKKNE/tT542ZbNQg="),
+    # Images référencées par leaflet.css (chemins relatifs)
+    "images/layers.png": ("leaflet@1.9.4/dist/images/layers.png", None),
+    "images/layers-2x.png": ("leaflet@1.9.4/dist/images/layers-2x.png", None),
+    "images/marker-icon.png": ("leaflet@1.9.4/dist/images/marker-icon.png", None),
+    "images/marker-icon-2x.png": ("leaflet@1.9.4/dist/images/marker-icon-2x.png", None),
+    "images/marker-shadow.png": ("leaflet@1.9.4/dist/images/marker-shadow.png", None),
+}
+LEAFLET_STYLES = ("leaflet.css", "MarkerCluster.css", "MarkerCluster.Default.css")
+LEAFLET_SCRIPTS = ("leaflet.js", "leaflet.markercluster.js")
+
+
+def _sri(data: bytes) -> str:
+    return "sha256-" + base64.b64encode(hashlib.sha256(data).digest()).decode("ascii")
+
+
+def _local_asset_ok(rel: str) -> bool:
+    """Fichier présent dans la copie locale et, s'il a une empreinte SRI, intact"""
+    path = os.path.join(LEAFLET_DIR, rel)
+    sri = LEAFLET_ASSETS[rel][1]
+    if sri is None:
+        return os.path.exists(path)
     try:
-        return float(x)
-    except Exception:
-        return default
+        with open(path, "rb") as f:
+            return _sri(f.read()) == sri
+    except OSError:
+        return False
 
 
-# ----------------- Worker (thread) -----------------
-class ProspectWorker(QThread):
-    # Signals
-    progress = Signal(int, int, str)          # current, total, message
-    map_ready = Signal(str)                   # html string
-    error = Signal(str, str)                  # title, details (traceback)
-    done = Signal()
-
-    def __init__(self, address: str, radius_km: float, parent=None):
-        super().__init__(parent)
-        self.address = address.strip()
-        self.radius_km = float(radius_km)
-        self._cancelled = False
+def _leaflet_local_ready() -> bool:
+    # CSS / JS revérifiés à chaque écriture de la carte: une copie modifiée sur disque
+    # n'est jamais servie (le CDN est utilisé et le fichier retéléchargé)
+    return all(_local_asset_ok(rel) for rel in LEAFLET_ASSETS)
 
-    def cancel(self):
-        self._cancelled = True
 
-    def run(self):
+def download_leaflet_assets():
+    """
+    Télécharge les fichiers Leaflet manquants (thread d'arrière-plan).
+    Au premier échec on abandonne: la carte continue d'utiliser le CDN.
+    """
+    for rel, (cdn_path, sri) in LEAFLET_ASSETS.items():
+        path = os.path.join(LEAFLET_DIR, rel)
+        if _local_asset_ok(rel):
+            continue
         try:
-            if not self.address:
-                self.error.emit("Adresse vide", "Veuillez saisir une adresse.")
-                self.done.emit()
-                return
-
-            # 1) Géocodage centre (programme 1)
-            self.progress.emit(0, 0, "Géocodage de l'adresse…")
-            lat, lon = te.geocode_address(self.address)  # peut lever Exception
-            center_lat, center_lon = float(lat), float(lon)
-            radius_m = int(self.radius_km * 1000)
-
-            if self._cancelled:
-                self.done.emit()
-                return
-
-            # 2) Recherche d'entreprises (programme 1)
-            self.progress.emit(0, 0, "Recherche des entreprises (Overpass)…")
-            try:
-                raw_businesses = te.find_businesses(center_lat, center_lon, radius=radius_m)
-            except TypeError:
-                # Compat: certains codes utilisent radius en 3e position; on retente si nécessaire
-                raw_businesses = te.find_businesses(center_lat, center_lon, radius_m)
-
-            # Attendu: liste de tuples (name, category, distance_m, address)
-            businesses = []
-            for tup in raw_businesses or []:
-                try:
-                    name, category, distance_m, address = tup
-                except Exception:
-                    # format inattendu -> on ignore
-                    continue
-                businesses.append({
-                    "name": sanitize(name, "Inconnu"),
-                    "category": sanitize(category, "n/a"),
-                    "distance_m": int(distance_m) if str(distance_m).isdigit() else safe_float(distance_m, 0),
-                    "address": sanitize(address, "Adresse inconnue"),
-                    "center_lat": center_lat,
-                    "center_lon": center_lon,
-                })
-
-            total = len(businesses)
-            if total == 0:
-                self.error.emit(
-                    "Aucune entreprise",
-                    f"Aucune entreprise trouvée dans un rayon de {radius_m} m autour de l'adresse."
-                )
-                self.done.emit()
-                return
-
-            # 3) Enrichissement (programme 2) + géocodage BAN de chaque prospect
-            self.progress.emit(0, total, f"Enrichissement de {total} prospect(s)…")
-            features = []
-            processed = 0
-
-            # Limiter le parallélisme (API publiques)
-            max_workers = 4
-            with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                futures = [ex.submit(self._enrich_one, item) for item in businesses]
-                for fut in as_completed(futures):
-                    if self._cancelled:
-                        break
-                    processed += 1
-                    try:
-                        res = fut.result()
-                        if res is not None:
-                            features.append(res)
-                    except Exception:
-                        # On poursuit même si un prospect échoue
-                        pass
-                    self.progress.emit(processed, total, f"Traitement {processed}/{total}…")
-
-            if self._cancelled:
-                self.done.emit()
+            r = rde.SESSION.get(LEAFLET_CDN + cdn_path, timeout=30)
+            r.raise_for_status()
+            if sri and _sri(r.content) != sri:
                 return
-
-            if not features:
-                self.error.emit(
-                    "Aucun prospect avec contact",
-                    "Aucun prospect ne possède d'email ou de téléphone."
-                )
-                self.done.emit()
-                return
-
-            # 4) Construire la carte
-            self.progress.emit(total, total, "Construction de la carte…")
-            html_map = self._build_map_html(center_lat, center_lon, radius_m, features)
-            self.map_ready.emit(html_map)
-            self.done.emit()
-
-        except Exception as e:
-            tb = traceback.format_exc(limit=2000)
-            self.error.emit("Erreur durant la prospection", f"{e}\n\n{tb}")
-            self.done.emit()
-
-    # ---- helpers internes du worker ----
-    def _enrich_one(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """
-        Enrichit un prospect en appelant le programme 2.
-        Retourne un Feature GeoJSON-like: {"lat":..., "lon":..., "props":{...}} ou None si pas de contact/coordonnées.
-        """
-        name = item["name"]
-        addr = item["address"]
-        distance_m = item["distance_m"]
-        center_lat = item["center_lat"]
-        center_lon = item["center_lon"]
-
-        # 1) Géocodage BAN de l'adresse de l'entreprise (pour positionner le marqueur)
-        lat, lon = None, None
-        try:
-            geo = rde.geocode_ban(addr)
-            if geo:
-                lat = geo.get("lat")
-                lon = geo.get("lon")
-        except Exception:
-            lat, lon = None, None
-
-        # 2) Enrichissement (programme 2)
-        data = None
-        try:
-            data = rde.run_test(name, addr)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Écriture atomique: un fichier présent est toujours complet
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(r.content)
+            os.replace(tmp, path)
         except Exception:
-            return None
+            return
 
-        # 3) Filtre contact
-        if not has_contact(data):
-            return None
 
-        # 4) Si pas de coord BAN, tenter coordonnées issues de run_test (géocodage de la requête)
-        if lat is None or lon is None:
-            geo2 = data.get("geocoding") or {}
-            lat = lat or geo2.get("lat")
-            lon = lon or geo2.get("lon")
+def leaflet_tags() -> Tuple[str, str]:
+    """Balises <link> et <script> de Leaflet: copie locale si complète, sinon CDN (SRI dans les deux cas)"""
+    local = _leaflet_local_ready()
 
-        if lat is None or lon is None:
-            return None
+    def attrs(rel: str) -> Tuple[str, str]:
+        cdn_path, sri = LEAFLET_ASSETS[rel]
+        if local:
+            url = QUrl.fromLocalFile(os.path.join(LEAFLET_DIR, rel)).toString()
+        else:
+            url = LEAFLET_CDN + cdn_path
+        return url, (f' integrity="{sri}" crossorigin=""' if sri else "")
 
-        lat = float(lat)
-        lon = float(lon)
+    styles = "\n".join('<link rel="stylesheet" href="{}"{}/>'.format(*attrs(rel)) for rel in LEAFLET_STYLES)
+    scripts = "\n".join('<script src="{}"{}></script>'.format(*attrs(rel)) for rel in LEAFLET_SCRIPTS)
+    return styles, scripts
 
-        contacts = extract_contacts(data)
-        comp = extract_company_summary(data)
-        owner = data.get("owner") or {}
-        props = {
-            "name": name,
-            "category": item.get("category"),
-            "address": addr,
-            "distance_m": distance_m,
-            "center_lat": center_lat,
-            "center_lon": center_lon,
-            "phones": contacts.get("phones", []),
-            "emails": contacts.get("emails", []),
-            "websites": contacts.get("websites", []),
-            "socials": contacts.get("socials", []),
-            "company": comp,
-            "owner_first_name": owner.get("first_name"),
-            "owner_last_name": owner.get("last_name"),
-            "owner_role": owner.get("role"),
-            "building_year": data.get("building_year"),
-            "roof_area_m2": data.get("roof_area_m2"),
-            "parking_area_m2": data.get("parking_area_m2"),
-        }
-        return {"lat": lat, "lon": lon, "props": props}
 
-    def _build_map_html(self, center_lat: float, center_lon: float, radius_m: int, features: List[Dict[str, Any]]) -> str:
-        """
-        Construit une page HTML Leaflet autonome (CDN) avec:
-          - fond satellite Esri + OSM,
-          - cercle du rayon,
-          - clustering,
-          - popups détaillées.
-        """
-        # Transformation en FeatureCollection GeoJSON
-        gj_features = []
-        for f in features:
-            lat = f["lat"]; lon = f["lon"]; p = f["props"]
-            # Nettoyage de propriétés pour JSON
-            props = {}
-            for k, v in p.items():
-                if isinstance(v, (list, tuple)):
-                    props[k] = [sanitize(x) for x in v]
-                elif isinstance(v, (dict,)):
-                    # dictionnaire simple -> on le garde
-                    props[k] = v
-                else:
-                    props[k] = sanitize(v)
-            gj_features.append({
-                "type": "Feature",
-                "geometry": {"type": "Point", "coordinates": [lon, lat]},
-                "properties": props
-            })
-        feature_collection = {"type": "FeatureCollection", "features": gj_features}
-        gj_json = json.dumps(feature_collection, ensure_ascii=False)
-
-        # HTML Leaflet
-        html_template = f"""<!doctype html>
+# Page Leaflet de la carte. {markers_json}: colonnes {"lat": [...], "lon": [...], "props": [...]}
+MAP_TEMPLATE = """<!doctype html>
 <html lang="fr">
 <head>
 <meta charset="utf-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
 <title>Carte Prospection</title>
 
-<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"
-  integrity="sha256-p4NxAoJBhIIN+hmNHrzRCf9tD/miZyoHS5obTRR9BMY=" crossorigin=""/>
-<link rel="stylesheet" href="https://unpkg.com/leaflet.markercluster@1.5.3/dist/MarkerCluster.css">
-<link rel="stylesheet" href="https://unpkg.com/leaflet.markercluster@1.5.3/dist/MarkerCluster.Default.css">
+{styles}
 
 <style>
   html, body, #map {{ height: 100%; margin: 0; padding: 0; }}
@@ -348,14 +270,12 @@ class ProspectWorker(QThread):
 <body>
 <div id="map"></div>
 
-<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"
-  integrity="sha256-20nQCchB9co0qIjJZRGuk2/Z9VM+kNiyxNV1lvTlZBo=" crossorigin=""></script>
-<script src="https://unpkg.com/leaflet.markercluster@1.5.3/dist/leaflet.markercluster.js"></script>
+{scripts}
 
 <script>
   const CENTER = [{center_lat:.7f}, {center_lon:.7f}];
   const RADIUS_M = {radius_m};
-  const GEOJSON = {gj_json};
+  const MARKERS = {markers_json};
 
   // Fonds de carte
   const esriSat = L.tileLayer(
@@ -391,12 +311,13 @@ class ProspectWorker(QThread):
   map.fitBounds(circle.getBounds(), {{ padding: [20, 20] }});
 
   // Centre (marqueur discret)
-  L.circleMarker(CENTER, {{
+  const centerMarker = L.circleMarker(CENTER, {{
     radius: 5, color: '#1d4ed8', fillColor: '#1d4ed8', fillOpacity: 0.9
   }}).bindTooltip('Centre de recherche').addTo(map);
 
   // Cluster
   const markers = L.markerClusterGroup();
+  map.addLayer(markers);
 
   function esc(x) {{
     if (x === null || x === undefined) return '';
@@ -473,29 +394,352 @@ class ProspectWorker(QThread):
     return html;
   }}
 
-  const gj = L.geoJSON(GEOJSON, {{
-    onEachFeature: function (feature, layer) {{
-      const p = feature.properties || {{}};
-      layer.bindPopup(buildPopup(p), {{ maxWidth: 420 }});
+  // Contenu de popup construit à la première ouverture puis mémorisé
+  // (au lieu de construire le HTML de tous les marqueurs à l'ajout)
+  function lazyPopup(props) {{
+    let html = null;
+    return function () {{
+      if (html === null) html = buildPopup(props);
+      return html;
+    }};
+  }}
+
+  // Colonnes parallèles lat / lon / props (plus compact qu'une FeatureCollection)
+  function makeLayers(data) {{
+    const n = data.lat.length;
+    const layers = new Array(n);
+    for (let i = 0; i < n; i++) {{
+      layers[i] = L.marker([data.lat[i], data.lon[i]])
+        .bindPopup(lazyPopup(data.props[i] || {{}}), {{ maxWidth: 420 }});
     }}
-  }});
+    return layers;
+  }}
 
-  markers.addLayer(gj);
-  map.addLayer(markers);
+  // Remplace les marqueurs (au chargement, puis depuis Qt via runJavaScript)
+  window.setMarkers = function (data, center, radiusM) {{
+    if (center) {{
+      circle.setLatLng(center);
+      centerMarker.setLatLng(center);
+    }}
+    if (radiusM) circle.setRadius(radiusM);
+
+    markers.clearLayers();
+    markers.addLayers(makeLayers(data));
+    fitMarkers();
+  }};
+
+  // Ajoute des marqueurs au fil de l'enrichissement (sans recadrer la vue)
+  window.addMarkers = function (data) {{
+    markers.addLayers(makeLayers(data));
+  }};
 
   // Ajuster le zoom sur tous les marqueurs + le cercle
-  try {{
-    const group = new L.featureGroup([circle, gj]);
-    map.fitBounds(group.getBounds(), {{ padding: [20,20] }});
-  }} catch(e) {{
-    // fallback
-    map.fitBounds(circle.getBounds(), {{ padding: [20,20] }});
-  }}
+  window.fitMarkers = function () {{
+    const bounds = circle.getBounds();
+    if (markers.getLayers().length) bounds.extend(markers.getBounds());
+    map.fitBounds(bounds, {{ padding: [20,20] }});
+  }};
+
+  setMarkers(MARKERS);
 </script>
 </body>
 </html>
 """
-        return html_template
+
+# Gabarit découpé une seule fois autour des marqueurs: seule la tête (ressources, centre, rayon)
+# est formatée à chaque carte, le JSON des marqueurs est simplement concaténé
+_MAP_HEAD, _MAP_TAIL = MAP_TEMPLATE.split("{markers_json}")
+_MAP_TAIL = _MAP_TAIL.format()
+
+EMPTY_MARKERS_JSON = '{"lat":[],"lon":[],"props":[]}'
+
+# Vue initiale de la carte vide (France métropolitaine)
+SHELL_CENTER = (46.6, 2.4)
+SHELL_RADIUS_M = 500_000
+
+
+def build_map_html(center_lat: float, center_lon: float, radius_m: int, markers_json: str) -> str:
+    """
+    Construit une page HTML Leaflet autonome (CDN) avec:
+      - fond satellite Esri + OSM,
+      - cercle du rayon,
+      - clustering,
+      - popups détaillées,
+      - window.setMarkers() pour remplacer les marqueurs sans recharger la page.
+    markers_json: colonnes des marqueurs déjà sérialisées (voir ProspectWorker._build_marker_columns).
+    """
+    styles, scripts = leaflet_tags()
+    return (
+        _MAP_HEAD.format(
+            styles=styles, scripts=scripts,
+            center_lat=center_lat, center_lon=center_lon, radius_m=radius_m
+        )
+        + markers_json
+        + _MAP_TAIL
+    )
+
+
+def write_map_shell(path: str = MAP_FILE) -> str:
+    """
+    Écrit la carte vide chargée une seule fois par la fenêtre;
+    chaque prospection y pousse ensuite ses marqueurs via setMarkers().
+    """
+    if not _leaflet_local_ready():
+        # Cette fois via le CDN; copie locale prête pour les prochains lancements
+        threading.Thread(target=download_leaflet_assets, daemon=True).start()
+    html_map = build_map_html(*SHELL_CENTER, SHELL_RADIUS_M, EMPTY_MARKERS_JSON)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html_map)
+    return path
+
+
+# ----------------- Worker (thread) -----------------
+class ProspectWorker(QThread):
+    # Signals
+    progress = Signal(int, int, str)          # current, total, message
+    markers_ready = Signal(str)               # appel JS (setMarkers/addMarkers/fitMarkers) à exécuter dans la carte
+    error = Signal(str, str)                  # title, details (traceback)
+    done = Signal()
+
+    def __init__(self, address: str, radius_km: float, parent=None):
+        super().__init__(parent)
+        self.address = address.strip()
+        self.radius_km = float(radius_km)
+        # Lu par les threads du pool (_enrich_one) comme par la boucle de run()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            if not self.address:
+                self.error.emit("Adresse vide", "Veuillez saisir une adresse.")
+                self.done.emit()
+                return
+
+            # 1) Géocodage centre (programme 1)
+            self.progress.emit(0, 0, "Géocodage de l'adresse…")
+            lat, lon = te.geocode_address(self.address)  # peut lever Exception
+            center_lat, center_lon = float(lat), float(lon)
+            radius_m = int(self.radius_km * 1000)
+
+            # Carte vidée et recentrée tout de suite; les marqueurs arrivent au fil de l'enrichissement
+            self.markers_ready.emit(
+                f"setMarkers({EMPTY_MARKERS_JSON}, [{center_lat:.7f}, {center_lon:.7f}], {radius_m});"
+            )
+
+            if self._cancel_event.is_set():
+                self.done.emit()
+                return
+
+            # 2) Recherche d'entreprises (programme 1)
+            self.progress.emit(0, 0, "Recherche des entreprises (Overpass)…")
+            raw_businesses = _find_businesses(center_lat, center_lon, radius_m)
+
+            # Attendu: liste de tuples (name, category, distance_m, address) ; format inattendu -> ignoré
+            businesses: List[Prospect] = []
+            # Doublons OSM (même nom à la même adresse): enrichis une seule fois,
+            # run_test ne dépendant que du nom et de l'adresse
+            seen = set()
+            for t in (raw_businesses or []):
+                if not isinstance(t, (tuple, list)) or len(t) != 4:
+                    continue
+                # Distance convertie une seule fois
+                try:
+                    distance_m = float(t[2])
+                except (TypeError, ValueError):
+                    distance_m = 0.0
+                # Ne jamais enrichir (étape coûteuse) un prospect hors du rayon exact
+                # (forme "not <=" pour écarter aussi une distance NaN)
+                if not distance_m <= radius_m:
+                    continue
+                name = sanitize(t[0], "Inconnu")
+                address = sanitize(t[3], "Adresse inconnue")
+                key = (name.strip().lower(), " ".join(address.lower().split()))
+                if key in seen:
+                    continue
+                seen.add(key)
+                businesses.append(Prospect(
+                    name=name,
+                    category=sanitize(t[1], "n/a"),
+                    distance_m=distance_m,
+                    address=address,
+                    center_lat=center_lat,
+                    center_lon=center_lon,
+                ))
+
+            total = len(businesses)
+            if total == 0:
+                self.error.emit(
+                    "Aucune entreprise",
+                    f"Aucune entreprise trouvée dans un rayon de {radius_m} m autour de l'adresse."
+                )
+                self.done.emit()
+                return
+
+            # 3) Enrichissement (programme 2) + géocodage BAN de chaque prospect
+            # Géocodage BAN de tous les prospects en une requête batch (au lieu d'une par prospect)
+            self.progress.emit(0, 0, f"Géocodage de {total} adresse(s)…")
+            try:
+                geos = rde.geocode_ban_batch([b.address for b in businesses])
+            except Exception:
+                # Repli: chaque prospect sera géocodé individuellement par run_test
+                geos = [None] * total
+
+            if self._cancel_event.is_set():
+                self.done.emit()
+                return
+
+            self.progress.emit(0, total, f"Enrichissement de {total} prospect(s)…")
+            features: List[Marker] = []
+            # Un même établissement (SIRET) trouvé sous plusieurs noms OSM n'a qu'un marqueur;
+            # les autres succursales de l'entreprise (même SIREN) gardent le leur.
+            # Pas de dédoublonnage par coordonnées: elles viennent du géocodage de l'adresse,
+            # partagé par toutes les entreprises d'un même bâtiment.
+            sirets = set()
+            sent = 0  # marqueurs déjà envoyés à la carte
+            processed = 0
+            last_emit = time.monotonic()
+            msg_tpl = f"Traitement {{}}/{total}…"
+
+            # Travail I/O-bound (le GIL est relâché) ; le débit vers chaque API publique
+            # est borné par les limiteurs par hôte de recup_donnees_entreprises
+            max_workers = min(32, max(8, total))
+            ex = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                pending = {ex.submit(self._enrich_one, item, geo) for item, geo in zip(businesses, geos)}
+                # wait() avec délai plutôt qu'as_completed: l'annulation est vue en moins de
+                # PROGRESS_INTERVAL_S même si aucun prospect ne se termine
+                while pending and not self._cancel_event.is_set():
+                    finished, pending = wait(pending, timeout=PROGRESS_INTERVAL_S, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        processed += 1
+                        try:
+                            res = fut.result()
+                            if res is not None:
+                                siret = res.props["company"].get("siret")
+                                if siret and siret in sirets:
+                                    continue
+                                sirets.add(siret)
+                                features.append(res)
+                        except Exception:
+                            # On poursuit même si un prospect échoue
+                            pass
+                    now = time.monotonic()
+                    if finished and (now - last_emit >= PROGRESS_INTERVAL_S or processed == total):
+                        last_emit = now
+                        self.progress.emit(processed, total, msg_tpl.format(processed))
+                        # Nouveaux marqueurs envoyés au même rythme que la progression
+                        if len(features) > sent:
+                            markers_json = dumps_json(self._build_marker_columns(features[sent:]))
+                            self.markers_ready.emit(f"addMarkers({markers_json});")
+                            sent = len(features)
+            finally:
+                # Sur annulation: prospects pas encore démarrés abandonnés, et les appels
+                # en cours (non interruptibles) ne sont pas attendus
+                ex.shutdown(wait=not self._cancel_event.is_set(), cancel_futures=True)
+
+            # Marqueurs enrichis depuis le dernier envoi (annulation entre deux envois):
+            # une recherche annulée garde tout ce qu'elle a trouvé
+            if len(features) > sent:
+                markers_json = dumps_json(self._build_marker_columns(features[sent:]))
+                self.markers_ready.emit(f"addMarkers({markers_json});")
+                sent = len(features)
+
+            if self._cancel_event.is_set():
+                self.done.emit()
+                return
+
+            if not features:
+                self.error.emit(
+                    "Aucun prospect avec contact",
+                    "Aucun prospect ne possède d'email ou de téléphone."
+                )
+                self.done.emit()
+                return
+
+            # 4) Tous les marqueurs sont déjà sur la carte: recadrer la vue
+            self.markers_ready.emit("fitMarkers();")
+            self.done.emit()
+
+        except Exception as e:
+            tb = traceback.format_exc(limit=2000)
+            self.error.emit("Erreur durant la prospection", f"{e}\n\n{tb}")
+            self.done.emit()
+
+    # ---- helpers internes du worker ----
+    def _enrich_one(self, item: Prospect, geo: Optional[Dict[str, Any]] = None) -> Optional[Marker]:
+        """
+        Enrichit un prospect en appelant le programme 2.
+        geo: géocodage BAN déjà résolu (batch), sinon run_test géocode lui-même.
+        Retourne un Marker (lat, lon, props) ou None si pas de contact/coordonnées.
+        """
+        name = item.name
+        addr = item.address
+
+        # Annulé pendant l'attente dans la file du pool: aucun appel réseau
+        if self._cancel_event.is_set():
+            return None
+
+        # 1) Enrichissement (programme 2), à partir du géocodage BAN batch si disponible
+        try:
+            data = rde.run_test(name, addr, geo=geo)
+        except (Exception, SystemExit):
+            # run_test lève SystemExit si l'adresse est introuvable dans la BAN
+            return None
+
+        # 2) Filtre contact (contacts et entreprise extraits dans le même passage)
+        analysis = analyze(data)
+        if analysis is None:
+            return None
+        contacts, comp = analysis
+
+        # 3) Coordonnées du marqueur: géocodage BAN de l'adresse de l'entreprise
+        geo2 = data.get("geocoding") or {}
+        try:
+            lat = float(geo2["lat"])
+            lon = float(geo2["lon"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        # Sans dirigeant identifié (cas courant): pas de recherche de clés
+        owner = data.get("owner")
+        if owner:
+            owner_first_name, owner_last_name, owner_role = (owner.get(k) for k in OWNER_FIELDS)
+        else:
+            owner_first_name = owner_last_name = owner_role = None
+        props = {
+            "name": name,
+            "category": item.category,
+            "address": addr,
+            "distance_m": item.distance_m,
+            "center_lat": item.center_lat,
+            "center_lon": item.center_lon,
+            "phones": contacts["phones"],
+            "emails": contacts["emails"],
+            "websites": contacts["websites"],
+            "socials": contacts["socials"],
+            "company": comp,
+            "owner_first_name": owner_first_name,
+            "owner_last_name": owner_last_name,
+            "owner_role": owner_role,
+        }
+        for k in BUILDING_FIELDS:
+            props[k] = data.get(k)
+        return Marker(lat, lon, props)
+
+    def _build_marker_columns(self, features: List[Marker]) -> Dict[str, List[Any]]:
+        """
+        Prospects en colonnes parallèles lat / lon / props (lues par setMarkers).
+        Les propriétés sont sérialisées telles quelles: textes déjà nettoyés dans run/_enrich_one,
+        échappement HTML fait une seule fois côté JS (esc()) à la construction des popups.
+        """
+        return {
+            "lat": [m.lat for m in features],
+            "lon": [m.lon for m in features],
+            "props": [m.props for m in features],
+        }
 
 
 # ----------------- Fenêtre principale -----------------
@@ -535,6 +779,15 @@ class MainWindow(QWidget):
         top.addWidget(self.cancel_btn)
 
         self.web = QWebEngineView()
+        # La carte (page Leaflet vide) est chargée une seule fois, au premier lancement;
+        # vrai quand elle est affichée (setMarkers disponible)
+        self._map_loaded = False
+        # URL de la carte une fois demandée: seul son chargement rend la carte disponible
+        # (pas celui de la page d'accueil setHtml, qui peut se terminer après le premier clic)
+        self._map_url: Optional[QUrl] = None
+        # Appels JS reçus avant la fin du chargement de la carte (rejoués dans l'ordre)
+        self._pending_scripts: List[str] = []
+        self.web.loadFinished.connect(self._on_load_finished)
         self.web.setHtml("<html><body><p style='font-family:sans-serif;padding:1rem'>Saisissez une adresse et lancez la prospection.</p></body></html>")
 
         layout = QVBoxLayout(self)
@@ -561,9 +814,14 @@ class MainWindow(QWidget):
         self.progress.setValue(0)
         self.progress.setFormat("%p%")
 
+        if self._map_url is None:
+            # Chargement par URL (pas de limite de 2 Mo de setHtml), en parallèle de la prospection
+            self._map_url = QUrl.fromLocalFile(write_map_shell())
+            self.web.setUrl(self._map_url)
+
         self.worker = ProspectWorker(address, radius_km)
         self.worker.progress.connect(self.on_progress)
-        self.worker.map_ready.connect(self.on_map_ready)
+        self.worker.markers_ready.connect(self.on_markers_ready)
         self.worker.error.connect(self.on_error)
         self.worker.done.connect(self.on_done)
         self.worker.start()
@@ -587,8 +845,20 @@ class MainWindow(QWidget):
             self.progress.setFormat(f"{msg}")
 
     @Slot(str)
-    def on_map_ready(self, html_str: str):
-        self.web.setHtml(html_str)
+    def on_markers_ready(self, script: str):
+        if self._map_loaded:
+            # Carte déjà affichée: on met à jour seulement les marqueurs
+            self.web.page().runJavaScript(script)
+        else:
+            self._pending_scripts.append(script)
+
+    @Slot(bool)
+    def _on_load_finished(self, ok: bool):
+        self._map_loaded = ok and self._map_url is not None and self.web.url() == self._map_url
+        if self._map_loaded and self._pending_scripts:
+            # Un seul appel: l'ordre setMarkers / addMarkers / fitMarkers est conservé
+            self.web.page().runJavaScript("\n".join(self._pending_scripts))
+            self._pending_scripts = []
 
     @Slot(str, str)
     def on_error(self, title: str, details: str):
@@ -609,7 +879,13 @@ def main():
     app = QApplication(sys.argv)
     w = MainWindow()
     w.show()
-    sys.exit(app.exec())
+    code = app.exec()
+    # Carte temporaire propre à ce processus (nom avec le pid): supprimée à la sortie
+    try:
+        os.remove(MAP_FILE)
+    except OSError:
+        pass
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file